@@ -144,21 +144,14 @@ CONV
     if [ -z "$AWSKLEAN_WRAPPER_ACCOUNT_NUMBERS" ]; then
        ${PYTHON_VERSION} "${LOCAL_REPO}/awsklean.py" $arguments_insert_ready
     else
-        # Split account number string to array
-        IFS=',' read -r -a account_number_array <<< "$AWSKLEAN_WRAPPER_ACCOUNT_NUMBERS"
-
-        # Loop through passed accounts
-        for aws_account_number in "${account_number_array[@]}"; do
-            # Check if role declared
-            if [ -z "$AWSKLEAN_WRAPPER_ROLE_NAME" ]; then
-                echo -e "\nERROR:\nTo use --aws-account-numbers OR to have the environment variable \$AWSKLEAN_WRAPPER_ACCOUNT_NUMBERS set \nyou must pass a corresponding AWS IAM role name using --aws-profile"
-                exit 1
-            else
-                # Loop through accounts
-                ${PYTHON_VERSION} "${LOCAL_REPO}/awsklean.py" $arguments_insert_ready --use-aws-role "${aws_account_number},${AWSKLEAN_WRAPPER_ROLE_NAME}"
-                sleep 5
-            fi
-        done
+        # Check if role declared
+        if [ -z "$AWSKLEAN_WRAPPER_ROLE_NAME" ]; then
+            echo -e "\nERROR:\nTo use --aws-account-numbers OR to have the environment variable \$AWSKLEAN_WRAPPER_ACCOUNT_NUMBERS set \nyou must pass a corresponding AWS IAM role name using --aws-profile"
+            exit 1
+        else
+            # Let awsklean fan out across the accounts in parallel, reusing role credentials between passthroughs
+            ${PYTHON_VERSION} "${LOCAL_REPO}/awsklean.py" $arguments_insert_ready --accounts "${AWSKLEAN_WRAPPER_ACCOUNT_NUMBERS}" --role-name "${AWSKLEAN_WRAPPER_ROLE_NAME}" --cache-role-credentials
+        fi
     fi
 }
 
@@ -1,22 +1,25 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import boto3
-import botocore
-from botocore.exceptions import ProfileNotFound
 import sys
 import os
 import argparse
 import ast
 import collections
+import collections.abc
+import csv
+import contextlib
+import io
 import json
-import requests
 import random
+import re
+import fnmatch
 import time
+import threading
+import queue
+import atexit
 import datetime
-from dateutil.tz import tzutc
-import dateutil.parser
-import copy
+import gzip
 
 
                                                                                                                                                                                                                                                               
@@ -27,14 +30,78 @@ script_version = "1.0.10"
 script_name = os.path.basename(__file__).strip(".py")
 is_dry_run_mode_set = False
 is_notify_slack_mode_set = False
-account_identification = None
-boto_config_info = None
-iam_client = None
-list_of_users_to_action = collections.defaultdict(dict)
 super_user_file_name = "superUsers.json"
 super_user_file_url_override_url = None
+super_user_matcher = None
+super_user_file_ttl = 60
+super_user_file_request_timeout = (5, 30)
 super_user_file_url = super_user_file_url_override_url if super_user_file_url_override_url else "https://raw.github.com/ooaklee/awsklean-iam-tool/master/superUsers.json"
-day_range = None
+utc_timezone = datetime.timezone.utc
+credential_report_placeholders = frozenset(["N/A", "no_information", "not_supported"])
+access_method_names = ("password_access", "access_key_1_access", "access_key_2_access")
+used_status, unused_status, not_enabled_status = 0, 1, 2
+access_method_statuses = (False, True, 'null')
+CredentialReportRow = collections.namedtuple("CredentialReportRow", [
+    "user",
+    "arn",
+    "password_enabled",
+    "password_last_used",
+    "access_key_1_active",
+    "access_key_1_last_rotated",
+    "access_key_1_last_used_date",
+    "access_key_2_active",
+    "access_key_2_last_rotated",
+    "access_key_2_last_used_date"
+])
+Finding = collections.namedtuple("Finding", ["account", "account_identification", "user", "access_method", "last_used", "age_in_days"])
+remediation_workers = 1
+iam_mutations_per_second = 5
+iam_mutation_max_attempts = 5
+is_asyncio_mode_set = False
+asyncio_concurrency = 20
+slack_notifier = None
+slack_notifier_lock = threading.Lock()
+slack_batch_size = 20
+slack_batch_seconds = 5
+slack_request_timeout = (5, 15)
+slack_flush_timeout = 60
+iam_throttling_error_codes = frozenset(["Throttling", "ThrottlingException", "RequestLimitExceeded", "TooManyRequestsException"])
+credential_report_timeout = 300
+max_credential_report_age = None
+report_cache_ttl = None
+report_cache_directory = f"{script_location}/.awsklean_cache"
+report_cache_max_size = 50
+is_role_credential_cache_set = False
+role_credential_refresh_seconds = 300
+role_credential_cache = {}
+is_role_credential_cache_loaded = False
+role_credential_cache_lock = threading.Lock()
+default_server_address = f"{script_location}/.awsklean.sock"
+server_request_timeout = 3600
+server_request_lock = threading.Lock()
+server_operations = collections.OrderedDict([
+    ("show", "show_users_with_no_usage_within"),
+    ("list", "list_users_with_no_usage_within"),
+    ("deactivate", "deactivate_access_for_users_with_no_usage_within"),
+    ("delete", "delete_access_for_users_with_no_usage_within"),
+    ("list-to-be-kleaned", "list_users_to_be_kleaned")
+])
+warm_credential_reports = None
+state_file = None
+remediation_plan_file = None
+remediation_plan = None
+planned_operations = []
+planned_operation_keys = set()
+metrics_collector = None
+metrics_json_file = None
+prometheus_textfile = None
+output_formats = ["ndjson", "csv", "json"]
+record_writer = None
+is_aggregate_mode_set = False
+aggregate_sort_options = ["age", "account", "user", "method"]
+aggregate_sort_by = "age"
+aggregate_top = 10
+remediation_plan_lock = threading.Lock()
 
 
 def is_dry_run_active(state: bool) -> None:
@@ -79,7 +146,7 @@ def live_mode_print(message: str):
 
 def is_super_user_override_url_passed_in(arguments: object):
     """Replaces the URL to get default super user json with custom user provided.
-    And removes local superUsers.json file if exists
+    The local superUsers.json file is replaced on download, as its metadata will not match the new URL
 
     :param arguments: Arguments passed into script
     :type arguments: object
@@ -87,16 +154,15 @@ def is_super_user_override_url_passed_in(arguments: object):
     :returns: None
     """
     global super_user_file_url_override_url
-    global super_user_file_name
-    global script_location
+    global super_user_file_ttl
 
-    # If override url passed then remove the existing super user list if exist
+    # If override url passed then use it for the super user list
     if arguments.super_users_url:
-        if os.path.exists(f"{script_location}/{super_user_file_name}"):
-            os.remove(f"{script_location}/{super_user_file_name}")
-
         # Override set
         super_user_file_url_override_url = arguments.super_users_url
+
+    if arguments.super_users_ttl is not None:
+        super_user_file_ttl = arguments.super_users_ttl
     
 
 def is_notify_slack_active(state: bool) -> None:
@@ -112,6 +178,228 @@ def is_notify_slack_active(state: bool) -> None:
 
     is_notify_slack_mode_set = state
 
+def is_credential_report_timeout_passed_in(timeout_option: int) -> None:
+    """Check to see if a credential report timeout is passed and update tool's default accordingly
+
+    :param timeout_option: Number of seconds to wait for the credential report
+    :type timeout_option: int
+
+    :returns: None
+    """
+    global credential_report_timeout
+
+    if timeout_option:
+        credential_report_timeout = timeout_option
+
+def is_max_report_age_passed_in(age_option: int) -> None:
+    """Check to see if a maximum credential report age is passed and update tool's default accordingly
+
+    :param age_option: Number of minutes an existing credential report can be reused for
+    :type age_option: int
+
+    :returns: None
+    """
+    global max_credential_report_age
+
+    if age_option is not None:
+        max_credential_report_age = age_option
+
+def is_report_cache_passed_in(arguments: object) -> None:
+    """Check to see if the local credential report cache is requested and update tool's defaults accordingly
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global report_cache_ttl
+    global report_cache_directory
+    global report_cache_max_size
+
+    if arguments.report_cache_ttl is not None:
+        report_cache_ttl = arguments.report_cache_ttl
+
+    if arguments.report_cache_dir:
+        report_cache_directory = arguments.report_cache_dir
+
+    if arguments.report_cache_max_size is not None:
+        report_cache_max_size = arguments.report_cache_max_size
+
+def is_state_file_passed_in(state_file_option: str) -> None:
+    """Check to see if a state file is passed and update tool's default accordingly
+
+    :param state_file_option: Path of the SQLite file to keep state between runs in
+    :type state_file_option: str
+
+    :returns: None
+    """
+    global state_file
+
+    if state_file_option:
+        state_file = state_file_option
+
+def is_remediation_plan_passed_in(arguments: object) -> None:
+    """Check to see if a plan file to write (--plan) or apply (--apply) is passed and update tool's defaults accordingly
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global remediation_plan_file
+    global remediation_plan
+
+    if (arguments.plan or arguments.apply) and (arguments.serve or arguments.via_server):
+        print(f"""ATTENTION: 
+--plan and --apply cannot be used with --serve or --via-server.""")
+        exit(1)
+
+    if arguments.plan:
+        if not (arguments.deactivate_access_for_users_with_no_usage_within or arguments.delete_access_for_users_with_no_usage_within):
+            print(f"""ATTENTION: 
+Please pass -d and/or -D with --plan to choose what should be planned.""")
+            exit(1)
+
+        remediation_plan_file = arguments.plan
+
+    if arguments.apply:
+        remediation_plan = load_remediation_plan_from(arguments.apply)
+
+def is_metrics_passed_in(arguments: object) -> None:
+    """Check to see if metrics are requested (--metrics-json, --prometheus-textfile or --statsd) and start collecting
+    them, making sure they are written on exit
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global metrics_collector
+    global metrics_json_file
+    global prometheus_textfile
+
+    if not (arguments.metrics_json or arguments.prometheus_textfile or arguments.statsd):
+        return
+
+    if arguments.statsd and not re.fullmatch(r".+:[0-9]+", arguments.statsd):
+        print(f"""ATTENTION: 
+Please pass the StatsD server as host:port, e.g. 127.0.0.1:8125.""")
+        exit(1)
+
+    metrics_json_file = arguments.metrics_json
+    prometheus_textfile = arguments.prometheus_textfile
+    metrics_collector = MetricsCollector(statsd_address=arguments.statsd)
+    atexit.register(write_metrics)
+
+def is_output_format_passed_in(arguments: object) -> None:
+    """Check to see if machine readable output is requested with --output and start writing records to stdout.
+    Everything else the tool prints goes to stderr instead, so stdout only holds the records
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global record_writer
+
+    if not arguments.output:
+        return
+
+    if arguments.serve or arguments.via_server:
+        print(f"""ATTENTION: 
+--output cannot be used with --serve or --via-server.""")
+        exit(1)
+
+    record_writer = RecordWriter(sys.stdout, arguments.output)
+    sys.stdout = sys.stderr
+    atexit.register(record_writer.close)
+
+def is_aggregate_passed_in(arguments: object) -> None:
+    """Check to see if a single fleet report is requested with --aggregate and update tool's defaults accordingly
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global is_aggregate_mode_set
+    global aggregate_sort_by
+    global aggregate_top
+
+    if not arguments.aggregate:
+        return
+
+    if arguments.serve or arguments.via_server or arguments.output:
+        print(f"""ATTENTION: 
+--aggregate cannot be used with --serve, --via-server or --output.""")
+        exit(1)
+
+    if not (arguments.accounts or arguments.accounts_file) or not arguments.list_users_with_no_usage_within:
+        print(f"""ATTENTION: 
+Please pass -l with the number of days, and the accounts using --accounts or --accounts-file, when using --aggregate.""")
+        exit(1)
+
+    is_aggregate_mode_set = True
+    aggregate_sort_by = arguments.sort_by
+    aggregate_top = max(0, arguments.top)
+
+def is_role_credential_cache_active(state: bool) -> None:
+    """Checks to see if --cache-role-credentials argument is passed to the script and sets global variable accordingly
+
+    :param state: Whether --cache-role-credentials was passed as argument
+    :type state: bool
+
+    :returns: None
+    """
+    global is_role_credential_cache_set
+
+    is_role_credential_cache_set = state
+
+def is_remediation_concurrency_passed_in(arguments: object) -> None:
+    """Check to see if remediation workers, asyncio mode or an IAM mutation rate are passed and update tool's defaults accordingly
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global remediation_workers
+    global iam_mutations_per_second
+    global is_asyncio_mode_set
+    global asyncio_concurrency
+
+    if arguments.remediation_workers is not None:
+        remediation_workers = arguments.remediation_workers
+
+    is_asyncio_mode_set = arguments.asyncio
+
+    if arguments.asyncio_concurrency is not None:
+        asyncio_concurrency = max(1, arguments.asyncio_concurrency)
+
+    if arguments.iam_mutations_per_second is not None:
+        if arguments.iam_mutations_per_second <= 0:
+            print(f"""ATTENTION: \n--iam-mutations-per-second must be greater than 0.""")
+            exit(1)
+
+        iam_mutations_per_second = arguments.iam_mutations_per_second
+
+def is_slack_batching_passed_in(arguments: object) -> None:
+    """Check to see if Slack digest settings are passed and update tool's defaults accordingly
+
+    :param arguments: Arguments passed into script
+    :type arguments: object
+
+    :returns: None
+    """
+    global slack_batch_size
+    global slack_batch_seconds
+
+    if arguments.slack_batch_size is not None:
+        slack_batch_size = max(1, arguments.slack_batch_size)
+
+    if arguments.slack_batch_seconds is not None:
+        slack_batch_seconds = arguments.slack_batch_seconds
+
 def is_an_aws_region_passed_in(region_option: str) -> None:
     """Check to see if region value passed and update tool's default region accordingly
 
@@ -126,7 +414,8 @@ def is_an_aws_region_passed_in(region_option: str) -> None:
         os.environ["AWS_DEFAULT_REGION"] = region_option
 
 def send_to_slack_this(message: str) -> None:
-    """Sends message to specified webhook that's saved as an environment variable
+    """Queues message to be sent to specified webhook that's saved as an environment variable. Messages are sent
+    in the background, batched into a single digest post
 
     :param message: Message to send to Slack channel
     :type message: str
@@ -142,17 +431,153 @@ def send_to_slack_this(message: str) -> None:
 set this before passing the --notify-slack argument.
         """)
         exit(1)
-    
+
+    get_slack_notifier_for(slack_webhook).notify(message)
+
+def post_to_slack_this(message: str, slack_webhook: str, session: object) -> None:
+    """Sends message to the passed webhook straight away
+
+    :param message: Message to send to Slack channel
+    :type message: str
+    :param slack_webhook: Slack webhook URL
+    :type slack_webhook: str
+    :param session: Requests session to send the message with
+    :type session: object
+
+    :returns: None
+    """
+    # Imported here so runs that never notify Slack do not pay for loading requests
+    import requests
+
     # Build valid dict containing message and configuration
-    configured_message_dict = ast.literal_eval(
-        f"""{{ "text": "{message}", "icon_url": "https://www.freeiconspng.com/uploads/black-key-symbol-icon-6.png", "username": "{script_name[:4].upper() + script_name[4:].lower()}"}}"""
-    )
+    configured_message_dict = {
+        "text": message,
+        "icon_url": "https://www.freeiconspng.com/uploads/black-key-symbol-icon-6.png",
+        "username": script_name[:4].upper() + script_name[4:].lower()
+    }
 
     # Send POST request to webhook containing message
-    requests.post(
-        slack_webhook,
-        data = json.dumps(configured_message_dict)
-    )
+    try:
+        with time_stage(None, "slack"):
+            session.post(
+                slack_webhook,
+                data = json.dumps(configured_message_dict),
+                timeout = slack_request_timeout
+            )
+    except requests.exceptions.RequestException as err:
+        print(f"""ATTENTION: \nUnable to send notification to Slack. \n\t- {str(err)}""")
+
+class SlackNotifier:
+    """Sends queued Slack messages from a background thread, joining them into one digest post every
+    batch size messages or batch seconds, whichever comes first
+
+    :param slack_webhook: Slack webhook URL
+    :type slack_webhook: str
+    :param batch_size: Most messages to put in one digest
+    :type batch_size: int
+    :param batch_seconds: Most seconds a message waits before its digest is sent
+    :type batch_seconds: float
+    """
+    def __init__(self, slack_webhook: str, batch_size: int, batch_seconds: float):
+        import requests
+
+        self.slack_webhook = slack_webhook
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.session = requests.Session()
+        self.messages = queue.Queue()
+        self.sender = threading.Thread(target=self.send_batches, daemon=True)
+        self.sender.start()
+
+    def notify(self, message: str) -> None:
+        """Queues the message to go out in the next digest
+
+        :param message: Message to send to Slack channel
+        :type message: str
+
+        :returns: None
+        """
+        self.messages.put(message)
+
+    def flush(self) -> None:
+        """Sends any queued messages and waits for them to go out, for at most the flush timeout so a stuck
+        sender never stops the run from finishing
+
+        :returns: None
+        """
+        is_flushed = threading.Event()
+        self.messages.put(is_flushed)
+        flush_deadline = time.monotonic() + slack_flush_timeout
+
+        while not is_flushed.wait(timeout=0.1):
+            if not self.sender.is_alive() or time.monotonic() >= flush_deadline:
+                print(f"""ATTENTION: \nGave up waiting for Slack notifications to be sent after {slack_flush_timeout} seconds, some may not have been sent.""")
+                return
+
+    def send_batches(self) -> None:
+        """Runs in the background thread, collecting messages and posting them as digests
+
+        :returns: None
+        """
+        pending_messages = []
+        batch_deadline = None
+
+        while True:
+            try:
+                timeout = max(0, batch_deadline - time.monotonic()) if pending_messages else None
+                message = self.messages.get(timeout=timeout)
+            except queue.Empty:
+                message = None
+
+            # Collect messages until the batch is full, its time is up, or a flush is requested
+            if isinstance(message, str):
+                if not pending_messages:
+                    batch_deadline = time.monotonic() + self.batch_seconds
+
+                pending_messages.append(message)
+
+                if len(pending_messages) < self.batch_size:
+                    continue
+
+            if pending_messages:
+                # Keep the sender running whatever goes wrong, so later digests and flushes are still handled
+                try:
+                    post_to_slack_this(message="\n".join(pending_messages), slack_webhook=self.slack_webhook, session=self.session)
+                except Exception as err:
+                    print(f"""ATTENTION: \nUnable to send notification to Slack. \n\t- {str(err)}""")
+
+                pending_messages = []
+
+            if isinstance(message, threading.Event):
+                message.set()
+
+def get_slack_notifier_for(slack_webhook: str) -> SlackNotifier:
+    """Gets the Slack notifier for the run, starting it (and making sure it is flushed on exit) on the first call
+
+    :param slack_webhook: Slack webhook URL
+    :type slack_webhook: str
+
+    :returns: The run's Slack notifier
+    :rtype: SlackNotifier
+    """
+    global slack_notifier
+
+    with slack_notifier_lock:
+        if slack_notifier is None:
+            slack_notifier = SlackNotifier(slack_webhook=slack_webhook, batch_size=slack_batch_size, batch_seconds=slack_batch_seconds)
+            atexit.register(flush_slack_notifications)
+
+    return slack_notifier
+
+def flush_slack_notifications() -> None:
+    """Sends any Slack messages still waiting to go out
+
+    :param None
+
+    :returns: None
+    """
+    if slack_notifier is not None:
+        slack_notifier.flush()
 
 # Generate random number
 def generate_random_number_between(first: int =  1, last: int = 101) -> int:
@@ -169,18 +594,360 @@ def generate_random_number_between(first: int =  1, last: int = 101) -> int:
     """
     return random.randint(first, last)
 
-def create_iam_client_using_default_system_credential():
-    """Create an IAM client using boto3 sessions and set relevant global variables
+class AccountContext:
+    """Everything the tool holds for the AWS account it is working on, so several accounts can be worked on
+    in the same process and the tool can be reused as a library
+
+    :param session: The boto3 session used for the account
+    :type session: object
+    :param iam_client: IAM client created from the session
+    :type iam_client: object
+    :param account_identification: The alias or account number of the AWS account
+    :type account_identification: str
+    :param account_number: The AWS account number, looked up with STS when needed if not passed
+    :type account_number: str
+    """
+    def __init__(self, session: object, iam_client: object, account_identification: str = None, account_number: str = None):
+        self.session = session
+        self.iam_client = iam_client
+        self.sts_client = None
+        self.account_identification = account_identification
+        self.account_number = account_number
+        self.list_of_users_to_action = UserAccessCollection()
+        self.day_range = None
+        self.credential_report_snapshot = None
+        self.credential_report_snapshot_by_user = None
+        self.credential_report_generated_time = None
+        self.access_key_index = {}
+        self.iam_mutation_rate_limiter = None
+        self.previous_actions = None
+        self.actions_taken = []
+        self.findings = []
+
+        # Count and time the API calls made with the session when metrics are being collected
+        if metrics_collector is not None:
+            instrument_session_for(self)
+
+    def with_same_clients(self) -> "AccountContext":
+        """Creates a new context for the same account, reusing the session and clients but none of the results
+
+        :returns: New account context
+        :rtype: AccountContext
+        """
+        context = AccountContext(session=self.session, iam_client=self.iam_client, account_identification=self.account_identification, account_number=self.account_number)
+        context.sts_client = self.sts_client
+
+        return context
+
+    def get_sts_client(self) -> object:
+        """Gets the STS client for the account, creating it from the session on the first call
+
+        :returns: STS client
+        :rtype: object
+        """
+        if self.sts_client is None:
+            self.sts_client = self.session.client("sts")
+
+        return self.sts_client
+
+class MetricsCollector:
+    """Counts and times every AWS API call, by account, service and operation, and times each stage of the run,
+    sending each measurement to StatsD straight away when a StatsD address is passed
+
+    :param statsd_address: host:port of the StatsD server to send measurements to, if any
+    :type statsd_address: str
+    """
+    def __init__(self, statsd_address: str = None):
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.api_calls = {}
+        self.stages = {}
+        self.statsd_socket = None
+
+        if statsd_address:
+            import socket
+
+            host, port = statsd_address.rsplit(":", 1)
+            self.statsd_address = (host, int(port))
+            self.statsd_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record_api_call(self, account: str, service: str, operation: str, seconds: float, error_code: str = None, retries: int = 0) -> None:
+        """Records a finished API call
+
+        :param account: The alias or account number of the AWS account
+        :type account: str
+        :param service: The AWS service, e.g. iam
+        :type service: str
+        :param operation: The API operation, e.g. ListAccessKeys
+        :type operation: str
+        :param seconds: How long the call took, retries included
+        :type seconds: float
+        :param error_code: The AWS error code if the call failed
+        :type error_code: str
+        :param retries: Number of times botocore retried the call
+        :type retries: int
+
+        :returns: None
+        """
+        is_throttled = error_code in iam_throttling_error_codes
+
+        with self.lock:
+            api_call = self.api_calls.setdefault((account, service, operation), {"count": 0, "errors": 0, "throttled": 0, "retries": 0, "seconds": 0.0, "max_seconds": 0.0})
+            api_call["count"] += 1
+            api_call["errors"] += 1 if error_code else 0
+            api_call["throttled"] += 1 if is_throttled else 0
+            api_call["retries"] += retries
+            api_call["seconds"] += seconds
+            api_call["max_seconds"] = max(api_call["max_seconds"], seconds)
+
+        self.send_to_statsd(f"api_call.{service}.{operation}", seconds * 1000, "ms")
+
+        if error_code:
+            self.send_to_statsd(f"api_call_errors.{service}.{operation}", 1, "c")
+        if is_throttled:
+            self.send_to_statsd(f"api_call_throttles.{service}.{operation}", 1, "c")
+        if retries:
+            self.send_to_statsd(f"api_call_retries.{service}.{operation}", retries, "c")
+
+    def record_stage(self, account: str, stage: str, seconds: float) -> None:
+        """Records a finished stage of the run
+
+        :param account: The alias or account number of the AWS account, empty for stages not tied to one
+        :type account: str
+        :param stage: Name of the stage, e.g. parse
+        :type stage: str
+        :param seconds: How long the stage took
+        :type seconds: float
+
+        :returns: None
+        """
+        with self.lock:
+            stage_timing = self.stages.setdefault((account, stage), {"count": 0, "seconds": 0.0})
+            stage_timing["count"] += 1
+            stage_timing["seconds"] += seconds
+
+        self.send_to_statsd(f"stage.{stage}", seconds * 1000, "ms")
+
+    def send_to_statsd(self, name: str, value: float, metric_type: str) -> None:
+        """Sends a single measurement to StatsD, ignoring any failure so metrics never stop a run
+
+        :returns: None
+        """
+        if self.statsd_socket is None:
+            return
+
+        try:
+            self.statsd_socket.sendto(f"{script_name}.{name}:{value:g}|{metric_type}".encode(), self.statsd_address)
+        except OSError:
+            pass
+
+    def get_summary(self) -> dict:
+        """Gets everything recorded so far
+
+        :returns: Dict of the run's start time and duration, and the API calls and stages recorded
+        :rtype: dict
+        """
+        with self.lock:
+            return {
+                "version": script_version,
+                "started_at": datetime.datetime.fromtimestamp(self.started_at, utc_timezone).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+                "duration_seconds": time.time() - self.started_at,
+                "api_calls": [
+                    dict(account=account, service=service, operation=operation, **api_call)
+                    for (account, service, operation), api_call in sorted(self.api_calls.items())
+                ],
+                "stages": [
+                    dict(account=account, stage=stage, **stage_timing)
+                    for (account, stage), stage_timing in sorted(self.stages.items())
+                ]
+            }
+
+def get_metrics_account_for(context: AccountContext) -> str:
+    """Gets the account the context's metrics are labelled with, its account number when known so accounts sharing
+    an alias (or whose lookups failed) are not merged
+
+    :param context: Account context the metrics are for
+    :type context: AccountContext
+
+    :returns: The account number, alias or N/A
+    :rtype: str
+    """
+    return context.account_number or context.account_identification or "N/A"
+
+def instrument_session_for(context: AccountContext) -> None:
+    """Hooks into the botocore events of the context's session and IAM client so every API call made with them
+    is counted and timed. Clients take a copy of the session's events when they are created, so the IAM client
+    (created before the context) is hooked into on its own
+
+    :param context: Account context holding the session
+    :type context: AccountContext
+
+    :returns: None
+    """
+    if metrics_collector is None or context.session is None:
+        return
+
+    def start_timing(context: dict = None, **kwargs) -> None:
+        if context is not None:
+            context["awsklean_started_at"] = time.perf_counter()
+
+    def finish_timing(event_name: str, context: dict = None, parsed: dict = None, **kwargs) -> None:
+        started_at = (context or {}).get("awsklean_started_at")
+
+        if started_at is None:
+            return
+
+        # Event names look like: after-call.iam.ListAccessKeys
+        _, service, operation = event_name.split(".", 2)
+        parsed = parsed or {}
+
+        # The call looking up the account number is the one call made before it is known
+        if account_context.account_number is None and operation == "GetCallerIdentity" and parsed.get("Account"):
+            account = parsed["Account"]
+        else:
+            account = get_metrics_account_for(account_context)
+
+        metrics_collector.record_api_call(
+            account,
+            service,
+            operation,
+            time.perf_counter() - started_at,
+            error_code=parsed.get("Error", {}).get("Code") or (type(kwargs["exception"]).__name__ if kwargs.get("exception") else None),
+            retries=parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        )
+
+    account_context = context
+    event_emitters = [context.session.events]
+
+    if context.iam_client is not None:
+        event_emitters.append(context.iam_client.meta.events)
+
+    for event_emitter in event_emitters:
+        # Sessions and clients are shared by contexts for the same account, only hook into each one once
+        if getattr(event_emitter, "is_instrumented_by_awsklean", False):
+            continue
+
+        event_emitter.register("before-parameter-build.*.*", start_timing)
+        event_emitter.register("after-call.*.*", finish_timing)
+        event_emitter.register("after-call-error.*.*", finish_timing)
+        event_emitter.is_instrumented_by_awsklean = True
+
+@contextlib.contextmanager
+def time_stage(context: AccountContext, stage: str):
+    """Times the block as a stage of the run when metrics are being collected
+
+    :param context: Account context the stage runs against, None for stages not tied to an account
+    :type context: AccountContext
+    :param stage: Name of the stage, e.g. parse
+    :type stage: str
+    """
+    if metrics_collector is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        metrics_collector.record_stage(get_metrics_account_for(context) if context else "", stage, time.perf_counter() - started_at)
+
+def get_prometheus_text_from(summary: dict) -> str:
+    """Writes the metrics summary in the Prometheus text exposition format, as read by the node exporter's textfile collector
+
+    :param summary: Metrics summary
+    :type summary: dict
+
+    :returns: Metrics in the Prometheus text format
+    :rtype: str
+    """
+    def labels_for(**labels) -> str:
+        """Writes the labels, escaping backslashes, double quotes and new lines in their values"""
+        escaped_labels = []
+
+        for name, value in labels.items():
+            escaped_value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped_labels.append(f'{name}="{escaped_value}"')
+
+        return "{" + ",".join(escaped_labels) + "}"
+
+    lines = [
+        f"# HELP {script_name}_run_duration_seconds How long the run took",
+        f"# TYPE {script_name}_run_duration_seconds gauge",
+        f"{script_name}_run_duration_seconds {summary['duration_seconds']:.6f}",
+        f"# HELP {script_name}_last_run_timestamp_seconds When the run finished",
+        f"# TYPE {script_name}_last_run_timestamp_seconds gauge",
+        f"{script_name}_last_run_timestamp_seconds {time.time():.3f}"
+    ]
+
+    api_call_metrics = [
+        ("api_calls_total", "count", "AWS API calls made"),
+        ("api_call_errors_total", "errors", "AWS API calls that failed"),
+        ("api_call_throttles_total", "throttled", "AWS API calls that failed because they were throttled"),
+        ("api_call_retries_total", "retries", "Times botocore retried AWS API calls"),
+        ("api_call_seconds_total", "seconds", "Time spent in AWS API calls")
+    ]
+
+    for metric, field, description in api_call_metrics:
+        lines.append(f"# HELP {script_name}_{metric} {description}")
+        lines.append(f"# TYPE {script_name}_{metric} counter")
+        for api_call in summary["api_calls"]:
+            lines.append(f"{script_name}_{metric}{labels_for(account=api_call['account'], service=api_call['service'], operation=api_call['operation'])} {api_call[field]:g}")
+
+    stage_metrics = [
+        ("stage_runs_total", "count", "Times each stage ran"),
+        ("stage_seconds_total", "seconds", "Time spent in each stage")
+    ]
+
+    for metric, field, description in stage_metrics:
+        lines.append(f"# HELP {script_name}_{metric} {description}")
+        lines.append(f"# TYPE {script_name}_{metric} counter")
+        for stage_timing in summary["stages"]:
+            lines.append(f"{script_name}_{metric}{labels_for(account=stage_timing['account'], stage=stage_timing['stage'])} {stage_timing[field]:g}")
+
+    return "\n".join(lines) + "\n"
+
+def write_metrics() -> None:
+    """Writes the metrics collected during the run to the files passed with --metrics-json and --prometheus-textfile
+
+    :param None
+
+    :returns: None
+    """
+    if metrics_collector is None:
+        return
+
+    summary = metrics_collector.get_summary()
+
+    for path, content in ((metrics_json_file, lambda: json.dumps(summary, indent=4)), (prometheus_textfile, lambda: get_prometheus_text_from(summary))):
+        if not path:
+            continue
+
+        # Write via a temporary file so readers never see half a file
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_path, "w") as file:
+                file.write(content())
+            os.replace(temporary_path, path)
+        except OSError as err:
+            print(f"""ATTENTION: \nUnable to write metrics to {path}. \n\t- {str(err)}""")
+
+def create_account_context_using_default_system_credential() -> AccountContext:
+    """Create an account context with an IAM client using the default boto3 session
+
+    :param None
+
+    :returns: Account context for the default credential
+    :rtype: AccountContext
     """
-    global iam_client
-    global boto_config_info
+    import boto3
 
     current_session = boto3.session.Session()
-    boto_config_info = copy.deepcopy(current_session)
-    iam_client = current_session.client("iam")
 
-def create_boto_client_using(credential: str, is_role: bool = False, session_token: str = "") -> None:
-    """Uses the passed credentials and attempts to create a boto client with it
+    return AccountContext(session=current_session, iam_client=current_session.client("iam"))
+
+def create_account_context_using(credential: str, is_role: bool = False, session_token: str = "", leading_context: AccountContext = None) -> AccountContext:
+    """Uses the passed credentials and attempts to create an account context with a boto client with it
 
 
     :param credentials: Desired credentials as a plain, comma-separated, or object like string
@@ -189,12 +956,17 @@ def create_boto_client_using(credential: str, is_role: bool = False, session_tok
     :type is_role: bool
     :param session_token: Token provide when using an assumed role
     :type str
+    :param leading_context: Account context of the leading credential, used to assume roles
+    :type leading_context: AccountContext
 
 
-    :returns: None
+    :returns: Account context for the credential
+    :rtype: AccountContext
     """
-    global iam_client
-    global boto_config_info
+    # Imported here so --help, --version and --via-server do not pay for loading boto3
+    import boto3
+    import botocore
+    from botocore.exceptions import ProfileNotFound
 
     # If the user passed a role
     if is_role:
@@ -203,42 +975,63 @@ def create_boto_client_using(credential: str, is_role: bool = False, session_tok
             print("\nPlease ensure you are passing the role using a comma-seperated string.\n Use `python {script_name}.py --help` for more information")
             exit(1)
         
-        # Attempt to use available leading AWS to create STS client
-        try:
-            sts_client = boto_config_info.client('sts')
-        except:
-            sts_client = boto3.client('sts')
-        
         # Create account number and role name variables
         aws_account_number_for_role, name_of_role = credential.split(",")
+        role_cache_key = f"{aws_account_number_for_role},{name_of_role}"
 
-        # Attempt to assume role
-        try:
-            assumed_role_object = sts_client.assume_role(
-                RoleArn = f"arn:aws:iam::{aws_account_number_for_role}:role/{name_of_role}",
-                RoleSessionName=f"AssumeRoleSession{generate_random_number_between()}"
-            )
-        except botocore.exceptions.ClientError as e:
-            # Will raise if role assumption fails
-            print(e)
-            print("""ATTENTION:
+        # Skip assuming the role while credentials from an earlier assumption are still valid
+        cached_role = get_cached_role_for(role_cache_key)
+
+        if cached_role is not None:
+            seconds_remaining = (cached_role['credentials']['Expiration'] - datetime.datetime.now(utc_timezone)).total_seconds()
+            print(f"{script_name} is reusing the credentials for role {name_of_role} on AWS account {aws_account_number_for_role}, valid for another {int(seconds_remaining // 60)} minute(s)")
+
+            # Reuse the session and IAM client already made with the credentials
+            if cached_role.get('session') is not None:
+                return AccountContext(session=cached_role['session'], iam_client=cached_role['iam_client'], account_number=aws_account_number_for_role)
+
+            credential = cached_role['credentials']
+        else:
+            # Attempt to use available leading AWS to create STS client
+            if leading_context is not None:
+                sts_client = leading_context.get_sts_client()
+            else:
+                sts_client = boto3.client('sts')
+
+            # Attempt to assume role
+            try:
+                assumed_role_object = sts_client.assume_role(
+                    RoleArn = f"arn:aws:iam::{aws_account_number_for_role}:role/{name_of_role}",
+                    RoleSessionName=f"AssumeRoleSession{generate_random_number_between()}"
+                )
+            except botocore.exceptions.ClientError as e:
+                # Will raise if role assumption fails
+                print(e)
+                print("""ATTENTION:
 The base lead account used (default) does not have permissions to carry out Role Assumption using, AWS STS.
 Please update its Policy to include the AWS IAM service.
 """)
-            exit(1)
-        else:
+                exit(1)
+
             # Get credential from returned object
             credential = assumed_role_object['Credentials']
 
-            # Temporary variables to hold assumed credential
-            tmp_access_key_id, tmp_secret_access_key, tmp_session_token = credential['AccessKeyId'], credential['SecretAccessKey'], credential['SessionToken']
-            
-            # Use temporary variables to create IAM client
-            tmp_credential_str_object = f"{{ 'aws_key_id': '{tmp_access_key_id}', 'aws_secret': '{tmp_secret_access_key}' }}"
-            create_boto_client_using( credential=tmp_credential_str_object, 
-                                        is_role=False, 
-                                        session_token=tmp_session_token
-                                    )
+        # Temporary variables to hold assumed credential
+        tmp_access_key_id, tmp_secret_access_key, tmp_session_token = credential['AccessKeyId'], credential['SecretAccessKey'], credential['SessionToken']
+        
+        # Use temporary variables to create IAM client
+        tmp_credential_str_object = f"{{ 'aws_key_id': '{tmp_access_key_id}', 'aws_secret': '{tmp_secret_access_key}' }}"
+        context = create_account_context_using( credential=tmp_credential_str_object, 
+                                    is_role=False, 
+                                    session_token=tmp_session_token
+                                )
+
+        # The account number is known from the role, set it before any call is made with the context
+        context.account_number = aws_account_number_for_role
+
+        cache_role_for(role_cache_key, credential, context)
+
+        return context
 
     # If user passed object or aws profile name
     else:
@@ -264,29 +1057,26 @@ IMPORTANT:
         if isinstance(credential, dict):
             # Check to see if session token not passed
             if not session_token:
-                # Create crrent session using dict and assign to global variable
+                # Create crrent session using dict
                 current_session = boto3.session.Session(aws_access_key_id=credential['aws_key_id'], aws_secret_access_key=credential['aws_secret'])
-                boto_config_info = copy.deepcopy(current_session)
             else:
-                # Create crrent session using dict AND session token, them assign to global variable
+                # Create crrent session using dict AND session token
                 current_session = boto3.session.Session(aws_access_key_id=credential['aws_key_id'], aws_secret_access_key=credential['aws_secret'], aws_session_token=session_token)
-                boto_config_info = copy.deepcopy(current_session)
             
             print(f"{script_name} is connecting using a credential object")
 
             # Create IAM client using session created above
-            iam_client = current_session.client("iam")
+            return AccountContext(session=current_session, iam_client=current_session.client("iam"))
         
         # look to see if credential passed a string
         elif isinstance(credential, str):
             # Assume the credential pass is set up in the aws credential config file
-            # AND create a session, them assign to global variable 
+            # AND create a session
             try:
                 current_session = boto3.session.Session(profile_name=credential)
-                boto_config_info = copy.deepcopy(current_session)
 
                 # Create IAM client
-                iam_client = current_session.client("iam")
+                return AccountContext(session=current_session, iam_client=current_session.client("iam"))
             except ProfileNotFound:
                 # Will raise if profile cannot be found
                 print(f"""ATTENTION: \nThe profile "{credential}" does not appear to be present in the AWS credentials config file. \nOn Unix systems, this often can be found in the ~/.aws directory. \nPlease double-check and add if necessary!""")
@@ -294,622 +1084,2853 @@ IMPORTANT:
         
         else:
             # Use default AWS credential
-            create_iam_client_using_default_system_credential()
+            return create_account_context_using_default_system_credential()
 
-def get_current_account_id() -> str:
-    """Gets the alias of the AWS account that has created the IAM client or returns account number
+def get_role_credential_cache_path() -> str:
+    """Gets the path of the file assumed role credentials are kept in, inside the report cache directory
 
     :param None
 
-    :returns: The alias or account number of the AWS account inspected by the tool
+    :returns: Path of the assumed role credential cache file
     :rtype: str
     """
-    global iam_client
-    global boto_config_info
+    return os.path.join(report_cache_directory, "assumed_roles.json")
 
-    # blank alias holder
-    alias_holder = []
+def load_role_credentials_from_cache() -> dict:
+    """Loads the assumed role credentials kept on disk by earlier runs
 
-    # Get list of aliases used for client
-    alias_paginator = iam_client.get_paginator('list_account_aliases')
+    :param None
 
+    :returns: Dict of credentials (with Expiration as a date) keyed by "<account>,<role>", empty if nothing is cached
+    :rtype: dict
+    """
     try:
-        for response in alias_paginator.paginate():
-            alias_holder.append(response['AccountAliases'])
-    except botocore.exceptions.EndpointConnectionError as err:
-        print(f"""ATTENTION: \nPlease pass an AWS region using the --aws-region argument. \n\t- {str(err)}""")
-        exit(1)
+        with open(get_role_credential_cache_path(), "r") as file:
+            cached_credentials = json.load(file)
+    except (IOError, ValueError):
+        return {}
 
-    # Assumption is made that the alias in the first index of the list is correct and make sure list is not empty and return first index
-    if len(alias_holder) > 0 and alias_holder[0] != []:
-        return alias_holder[0][0]
-    else:
-        # Check to see if boto_config_info has a value set, which will assume 
-        # that either a role, profile, or credential object was passed.
-        if boto_config_info != None:
-            try:
-                # Use boto_config_info to build STS client and retrieve the account number.
-                account_number = boto_config_info.client('sts').get_caller_identity().get('Account')
-            except:
-                # TODO: Create more specific exception handlers with actions
-                return "N/A - GET ACC FAIL"
-            else:
-                return account_number
+    for credentials in cached_credentials.values():
+        credentials['Expiration'] = convert_this_to_date(string=credentials['Expiration'])
 
-def get_all_users_in_aws_account():
-    """Uses global IAM client to generate a list of all the users in the account with their
-    user account information
+    return cached_credentials
+
+def save_role_credentials_to_cache() -> None:
+    """Saves the assumed role credentials that are still valid to disk, readable only by the current user
 
     :param None
 
-    :returns: List of user accounts and account information. A row per user.
-    :rtype: list
+    :returns: None
     """
-    seconds_to_wait = 5
+    cached_credentials = {
+        role_cache_key: {
+            'AccessKeyId': cached_role['credentials']['AccessKeyId'],
+            'SecretAccessKey': cached_role['credentials']['SecretAccessKey'],
+            'SessionToken': cached_role['credentials']['SessionToken'],
+            'Expiration': cached_role['credentials']['Expiration'].astimezone(utc_timezone).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        }
+        for role_cache_key, cached_role in role_credential_cache.items()
+        if is_role_credential_fresh(cached_role['credentials'])
+    }
+
+    os.makedirs(report_cache_directory, mode=0o700, exist_ok=True)
+
+    path = get_role_credential_cache_path()
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    # Create the temporary file with owner only permissions before any credentials are written to it
+    file_descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(file_descriptor, "w") as file:
+        json.dump(cached_credentials, file)
+    os.replace(temporary_path, path)
+
+def is_role_credential_fresh(credentials: dict) -> bool:
+    """Checks the assumed role credentials will not expire within the refresh window
+
+    :param credentials: Credentials returned by STS assume role
+    :type credentials: dict
+
+    :returns: Whether the credentials can still be used
+    :rtype: bool
+    """
+    return credentials['Expiration'] - datetime.datetime.now(utc_timezone) > datetime.timedelta(seconds=role_credential_refresh_seconds)
 
-    # Generate IAM user report
-    response = iam_client.generate_credential_report()
+def get_cached_role_for(role_cache_key: str) -> dict:
+    """Gets the credentials, and any session and IAM client made with them, from an earlier assumption of the role.
+    Credentials kept on disk are only read when --cache-role-credentials is passed
 
-    # Attempt to get report
-    try:
-        response = iam_client.get_credential_report()
-    except iam_client.exceptions.CredentialReportNotReadyException:
-        print(f"""ATTENTION:\nGathering information for all users, please wait.  The process will take approximately {seconds_to_wait} seconds.""")
-        time.sleep(seconds_to_wait)
-        try:
-            response = iam_client.get_credential_report()
-        except iam_client.exceptions.CredentialReportNotReadyException:
-            print(f"""ATTENTION:\nSomething has gone wrong, please try again in around {seconds_to_wait} minutes""")
-            exit(1)
-    
-    # Return a list with the information about all the users from report
-    return response['Content'].decode().split('\n')
+    :param role_cache_key: The AWS account number and role name, as a comma-separated string
+    :type role_cache_key: str
 
-def convert_this_to_date(string: str = "") -> object:
-    """Converts passed string to a date object
+    :returns: Dict holding the credentials, session and IAM client, or None if there are no valid credentials
+    :rtype: dict
+    """
+    global is_role_credential_cache_loaded
 
-    :param string: Date written as string
-    :type string: str
+    with role_credential_cache_lock:
+        if is_role_credential_cache_set and not is_role_credential_cache_loaded:
+            for cached_role_cache_key, credentials in load_role_credentials_from_cache().items():
+                role_credential_cache.setdefault(cached_role_cache_key, {'credentials': credentials})
 
-    :returns: Date object
-    :rtype object
+            is_role_credential_cache_loaded = True
+
+        cached_role = role_credential_cache.get(role_cache_key)
+
+        if cached_role is None or not is_role_credential_fresh(cached_role['credentials']):
+            return None
+
+        return cached_role
+
+def cache_role_for(role_cache_key: str, credentials: dict, context: AccountContext) -> None:
+    """Keeps the role's credentials, session and IAM client for reuse, saving the credentials to disk
+    when --cache-role-credentials is passed
+
+    :param role_cache_key: The AWS account number and role name, as a comma-separated string
+    :type role_cache_key: str
+    :param credentials: Credentials returned by STS assume role
+    :type credentials: dict
+    :param context: Account context created with the credentials
+    :type context: AccountContext
+
+    :returns: None
     """
-    return dateutil.parser.parse(string)
+    with role_credential_cache_lock:
+        role_credential_cache[role_cache_key] = {
+            'credentials': credentials,
+            'session': context.session,
+            'iam_client': context.iam_client
+        }
 
-def load_super_users_file_from(destination: str) -> dict:
-    """Gets the superuser file dependant on destination passed
+        if is_role_credential_cache_set:
+            save_role_credentials_to_cache()
 
-    :param destination: How the script should attempt to load th file, locally or remotely.
-    :type string
+def get_current_account_id(context: AccountContext) -> str:
+    """Gets the alias of the AWS account that has created the IAM client or returns account number
 
-    :returns: Dict containing list of super user IAM user names
-    :rtype dict
+    :param context: Account context to identify
+    :type context: AccountContext
+
+    :returns: The alias or account number of the AWS account inspected by the tool
+    :rtype: str
     """
-    global super_user_file_name
-    global script_location
-    global super_user_file_url
-    super_users_data = None
+    import botocore
 
-    if destination == "local":
-        # Open file
-        with open(f"{script_location}/{super_user_file_name}", "r") as file:
-            super_users_data=file.read().strip()
-            super_users_data=json.loads(super_users_data)
-        
-        return super_users_data
-    elif destination == "remote":
-        # Download file from URL
-        response = requests.get(super_user_file_url)
-        
-        if response.status_code == 200:
-            # Write content of URL body to file
-            with open(f"{script_location}/{super_user_file_name}", "w") as file:
-                file.write(response.text)
-            
-            # Return the dict loaded from the function
-            return load_super_users_file_from(destination="local")
+    # blank alias holder
+    alias_holder = []
+
+    # Get list of aliases used for client
+    alias_paginator = context.iam_client.get_paginator('list_account_aliases')
+
+    try:
+        for response in alias_paginator.paginate():
+            alias_holder.append(response['AccountAliases'])
+    except botocore.exceptions.EndpointConnectionError as err:
+        print(f"""ATTENTION: \nPlease pass an AWS region using the --aws-region argument. \n\t- {str(err)}""")
+        exit(1)
+
+    # Assumption is made that the alias in the first index of the list is correct and make sure list is not empty and return first index
+    if len(alias_holder) > 0 and alias_holder[0] != []:
+        return alias_holder[0][0]
+    else:
+        try:
+            # Use the context's session to build STS client and retrieve the account number.
+            account_number = context.get_sts_client().get_caller_identity().get('Account')
+        except:
+            # TODO: Create more specific exception handlers with actions
+            return "N/A - GET ACC FAIL"
         else:
-            raise Exception(f"Could not GET from: {super_user_file_url}")
+            return account_number
 
+def get_account_number_for(context: AccountContext) -> str:
+    """Gets the number of the AWS account the context is for, asking STS the first time if it is not already known
 
+    :param context: Account context to inspect
+    :type context: AccountContext
 
-def get_super_users_dict() -> dict:
-    """Gets the dict which holds the list of super users (AWS IAM user accounts to ignore). Loads locally if present 
-    otherwise pulls from remote location/ URL
+    :returns: The AWS account number, or None if it cannot be found
+    :rtype: str
+    """
+    if context.account_number is None:
+        try:
+            context.account_number = context.get_sts_client().get_caller_identity().get('Account')
+        except Exception:
+            return None
 
-    :param None
+    return context.account_number
 
-    :returns: dict of superusers
-    :rtype dict
+def get_backoff_seconds_for(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
+    """Works out how long to wait before the next attempt using exponential backoff with jitter
+
+    :param attempt: The number of attempts made so far, starting at 0
+    :type attempt: int
+    :param base: Seconds to wait (before jitter) after the first attempt
+    :type base: float
+    :param cap: The most seconds to wait (before jitter) between attempts
+    :type cap: float
+
+    :returns: Number of seconds to wait
+    :rtype: float
     """
-    # Attempt to load super user file locally
-    try:
-        dict_of_super_users = load_super_users_file_from(destination = "local")
-    except IOError:
-        # There isn't a local file 
+    seconds_to_wait = min(cap, base * (2 ** attempt))
+
+    # Keep at least half of the wait and randomise the rest to avoid callers retrying in lockstep
+    return (seconds_to_wait / 2) + random.uniform(0, seconds_to_wait / 2)
+
+def get_cached_credential_reports_for(account: str = None) -> list:
+    """Lists the credential reports held in the local cache, newest first
+
+    :param account: Only list the reports cached for this AWS account, all accounts otherwise
+    :type account: str
+
+    :returns: List of tuples holding the path, account and generated time (epoch seconds) of each cached report
+    :rtype: list
+    """
+    global report_cache_directory
+    cached_reports = []
+
+    if not os.path.isdir(report_cache_directory):
+        return cached_reports
+
+    for file_name in os.listdir(report_cache_directory):
+        # Cached reports are named <account>.<generated time>.csv.gz
+        if not file_name.endswith(".csv.gz"):
+            continue
+
         try:
-            dict_of_super_users = load_super_users_file_from(destination = "remote")
-        except:
-            print(f"""ATTENTION:\nPlease save a json file named {super_user_file_name} in {script_location} with a file body as follows:""")
-            print("""
-{
-    "superUsers" : [
-        "<root_account>",
-	"awsklean",
-        "[AWS IAM user name]"
-    ]
-}
-""")
-            print("""
-- [AWS IAM user name] can be multiple users comma separated using JSON forrmatting
-""")
-            exit(1)
-    
-    return dict_of_super_users
+            cached_account, generated_time = file_name[:-len(".csv.gz")].rsplit(".", 1)
+            generated_time = int(generated_time)
+        except ValueError:
+            continue
 
-def get_all_users_not_used_in_the_last(number_of_days: int = 60, source_report: list = get_all_users_in_aws_account, display=False):
-    """Checks to see if any user accounts in the source report have not logged in AWS in specified time.
+        if account is None or cached_account == account:
+            cached_reports.append((os.path.join(report_cache_directory, file_name), cached_account, generated_time))
 
-    :param days: The number of days before today to check up until
-    :type days: int
-    :param source_report: List of the AWS IAM accounts to check
-    :type list
-    :param display: Whether function should output to the terminal or return list
+    return sorted(cached_reports, key=lambda cached_report: cached_report[2], reverse=True)
 
-    :returns: List of user objects that are unused within the specified time
+def load_credential_report_from_cache_for(account: str) -> tuple:
+    """Loads the newest credential report cached for the account if it is within the cache TTL
+
+    :param account: The AWS account the report belongs to
+    :type account: str
+
+    :returns: Tuple of the list of user accounts and account information (a row per user) and when the report was
+    generated (epoch seconds), or None if nothing usable is cached
+    :rtype: tuple
     """
+    global report_cache_ttl
 
-    number_of_days_as_delta = datetime.timedelta(days=number_of_days)
+    for path, _, generated_time in get_cached_credential_reports_for(account):
+        report_age = time.time() - generated_time
 
-    # Get current date/time in the same timezone used by AWS system
-    current_date_tzutc = datetime.datetime.now(tzutc())
+        # Reports are sorted newest first, so nothing after this will be fresh either
+        if report_age > report_cache_ttl * 60:
+            return None
 
-    # List to hold users who have not been used in specified time
-    list_of_all_aws_users_out_of_range = []
+        try:
+            with gzip.open(path, "rt") as file:
+                content = file.read()
+        except (IOError, EOFError):
+            # Skip over unreadable or partially written entries
+            continue
 
-    # Dict holding list of super users
-    super_user_keep =  get_super_users_dict()
+        print(f"{script_name} is using the cached credential report generated {int(report_age // 60)} minute(s) ago")
 
-    for user in source_report()[1:]:
-        user = user.split(",")
+        return content.split('\n'), generated_time
+
+    return None
+
+def save_credential_report_to_cache_for(account: str, generated_time: object, content: str) -> None:
+    """Saves the decoded credential report in the local cache, then evicts expired entries and the oldest
+    entries until the cache is within its maximum size
+
+    :param account: The AWS account the report belongs to
+    :type account: str
+    :param generated_time: When AWS generated the report
+    :type generated_time: object
+    :param content: The decoded credential report
+    :type content: str
+
+    :returns: None
+    """
+    global report_cache_directory
+
+    os.makedirs(report_cache_directory, mode=0o700, exist_ok=True)
+
+    path = os.path.join(report_cache_directory, f"{account}.{int(generated_time.timestamp())}.csv.gz")
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    # Write to a temporary file first so a crash never leaves a half written entry behind
+    with gzip.open(temporary_path, "wt") as file:
+        file.write(content)
+    os.chmod(temporary_path, 0o600)
+    os.replace(temporary_path, path)
+
+    evict_from_credential_report_cache()
+
+def evict_from_credential_report_cache() -> None:
+    """Removes cached credential reports older than the cache TTL, then the oldest reports until the
+    cache is within its maximum size
+
+    :param None
+
+    :returns: None
+    """
+    global report_cache_ttl
+    global report_cache_max_size
+    cache_size = 0
 
+    for path, _, generated_time in get_cached_credential_reports_for():
         try:
-            # Check if password_enabled is set to 'true'
-            if user[3] == 'true':
-                # Check to see if there is any information on the last time password was used
-                if user[4] == 'no_information':
-                    # Make sure user is not super user before adding to list
-                    if user[0] not in super_user_keep['superUsers']:
-                        list_of_users_to_action[user[0]]['password_access'] = 'null'
-                # Check if password_last_used is older than the specificed range        
-                elif convert_this_to_date( string = user[4] ) < (current_date_tzutc - number_of_days_as_delta):
-                    # Make sure user is not super user before adding to list
-                    if user[0] not in super_user_keep['superUsers']:
-                        list_of_all_aws_users_out_of_range.append(user)
-                        list_of_users_to_action[user[0]]['password_access'] = True
-                else:
-                    # Make sure user is not super user before adding to list
-                    if user[0] not in super_user_keep['superUsers']:
-                        list_of_users_to_action[user[0]]['password_access'] = False
-            else:
-                # Make sure user is not super user before adding to list
-                if user[0] not in super_user_keep['superUsers']:
-                    list_of_users_to_action[user[0]]['password_access'] = 'null'
-            # Check if access_key_1_active is set to 'true'
-            if user[8] == 'true':
-                # Check to see if access_key_last_used_date is NOT 'N/A'
-                if user[10] != 'N/A':
-                    # Check to see if access_key_last_used_date is 'no_information'
-                    if user[10] == 'no_information':
-                        if user[0] not in super_user_keep['superUsers']:
-                            list_of_users_to_action[user[0]]['access_key_1_access'] = True
-                    # Check if access_key_1_last_used_date is older than the specificed range
-                    elif convert_this_to_date( string = user[10] ) < (current_date_tzutc - number_of_days_as_delta):
-                        # Make sure user is not super user before adding to list
-                        if user[0] not in super_user_keep['superUsers']:
-                            list_of_all_aws_users_out_of_range.append(user)
-                            list_of_users_to_action[user[0]]['access_key_1_access'] = True
-                    else:
-                        # Make sure user is not super user before adding to list
-                        if user[0] not in super_user_keep['superUsers']:
-                            list_of_users_to_action[user[0]]['access_key_1_access'] = False
-                else:
-                    # Make sure user is not super user before adding to list
-                    if user[0] not in super_user_keep['superUsers']:
-                        list_of_users_to_action[user[0]]['access_key_1_access'] = True
-            else:
-                # Make sure user is not super user before adding to list
-                if user[0] not in super_user_keep['superUsers']:
-                    list_of_users_to_action[user[0]]['access_key_1_access'] = 'null'
-
-            # Check if access_key_2_active is set to 'true'
-            if user[13] == 'true':
-                # Check to see if access_key_2_last_used_date is NOT 'N/A'
-                if user[15] != 'N/A':
-                    # Check to see if access_key_2_last_used_date is 'no_information'
-                    if user[15] == 'no_information':
-                        if user[0] not in super_user_keep['superUsers']:
-                            list_of_users_to_action[user[0]]['access_key_2_access'] = True
-                    # Check if access_key_2_last_used_date is older than the specificed range
-                    elif convert_this_to_date( string = user[15] ) < (current_date_tzutc - number_of_days_as_delta):
-                        # Make sure user is not super user before adding to list
-                        if user[0] not in super_user_keep['superUsers']:
-                            list_of_all_aws_users_out_of_range.append(user)
-                            list_of_users_to_action[user[0]]['access_key_2_access'] = True
-                    else:
-                        # Make sure user is not super user before adding to list
-                        if user[0] not in super_user_keep['superUsers']:
-                            list_of_users_to_action[user[0]]['access_key_2_access'] = False
-                else:
-                    # Make sure user is not super user before adding to list
-                    if user[0] not in super_user_keep['superUsers']:
-                        list_of_users_to_action[user[0]]['access_key_2_access'] = True
-            else:
-                # Make sure user is not super user before adding to list
-                if user[0] not in super_user_keep['superUsers']:
-                    list_of_users_to_action[user[0]]['access_key_2_access'] = 'null'
-        except KeyError as identifier:
-            # TODO: Create more specific actions
+            if time.time() - generated_time > report_cache_ttl * 60:
+                os.remove(path)
+                continue
+
+            cache_size += os.path.getsize(path)
+            if cache_size > report_cache_max_size * 1024 * 1024:
+                os.remove(path)
+        except OSError:
+            # Entry may have been removed by another run
             pass
 
-    if display:
-        # Print the list of users to terminal
-        print(json.dumps(list_of_users_to_action, indent=4, separators=(',', ': ')))
-    else:
-        # Return list
-        return list_of_users_to_action
+def get_existing_credential_report_if_fresh(context: AccountContext) -> dict:
+    """Gets the credential report AWS already holds for the account if it was generated within the
+    maximum report age
 
-def users_with_at_least_one_unused_access_method_from(collections_of_users: dict):
-    """Checks which of the users from the passed collection has at least one access method that failed 
-    preliminary usage test and will be affected if a modifying argument were to be passed.
+    :param context: Account context to get the report for
+    :type context: AccountContext
 
-    :param collections_of_users: Collection of users dict
-    :type collections_of_users: dict
+    :returns: The get_credential_report response if the existing report is fresh enough, otherwise None
+    :rtype: dict
+    """
+    global max_credential_report_age
+    iam_client = context.iam_client
 
-    :returns: None
+    try:
+        response = iam_client.get_credential_report()
+    except (iam_client.exceptions.CredentialReportNotPresentException,
+            iam_client.exceptions.CredentialReportExpiredException,
+            iam_client.exceptions.CredentialReportNotReadyException):
+        return None
+
+    # Check the report was generated within the allowed age
+    report_age = datetime.datetime.now(utc_timezone) - response['GeneratedTime']
+    if report_age > datetime.timedelta(minutes=max_credential_report_age):
+        return None
+
+    print(f"{script_name} is reusing the credential report generated {int(report_age.total_seconds() // 60)} minute(s) ago")
+
+    return response
+
+def get_all_users_in_aws_account(context: AccountContext):
+    """Uses the account context's IAM client to generate a list of all the users in the account with their
+    user account information
+
+    :param context: Account context to get the users for
+    :type context: AccountContext
+
+    :returns: List of user accounts and account information. A row per user.
+    :rtype: list
     """
-    global account_identification
-    global is_notify_slack_mode_set
-    global day_range
+    global credential_report_timeout
+    global max_credential_report_age
+    global report_cache_ttl
+    iam_client = context.iam_client
+    attempt = 0
+    deadline = time.time() + credential_report_timeout
+
+    # Cache reports by account number, as aliases are optional and lookups that fail all look the same
+    account_number = get_account_number_for(context) if report_cache_ttl is not None else None
+    is_report_cache_usable = account_number is not None
+
+    # Read the report from the local cache if a recent copy is held
+    if is_report_cache_usable:
+        cached_report = load_credential_report_from_cache_for(account_number)
+
+        if cached_report:
+            report, context.credential_report_generated_time = cached_report
+            return report
+
+    # Skip generating and waiting on a new report if the existing one is still fresh
+    response = None
+    if max_credential_report_age is not None:
+        response = get_existing_credential_report_if_fresh(context)
+
+    # Generate IAM user report, polling its state until AWS reports it as complete
+    while not response:
+        generate_response = iam_client.generate_credential_report()
+
+        if generate_response.get('State') == 'COMPLETE':
+            # Attempt to get report
+            try:
+                response = iam_client.get_credential_report()
+                break
+            except iam_client.exceptions.CredentialReportNotReadyException:
+                pass
 
-    # Blank list to hold affected users
-    affected_users_list = []
+        if attempt == 0:
+            print(f"""ATTENTION:\nGathering information for all users, please wait. The process can take up to {credential_report_timeout} seconds.""")
 
-    # Loop through collection, find the users that have access methods that will be actioned
-    # and add to blank list
-    for user in collections_of_users.keys():
-        for access_method, value in collections_of_users[user].items():
-            if value and value != 'null':
-                affected_users_list.append(user)
-    
-    # Remove duplicated
-    affected_users_set = set(affected_users_list)
+        seconds_remaining = deadline - time.time()
+        if seconds_remaining <= 0:
+            print(f"""ATTENTION:\nThe credential report was not ready within {credential_report_timeout} seconds, please try again later or pass a larger --credential-report-timeout""")
+            exit(1)
 
-    # Length of affected users
-    number_of_affected_users = len(affected_users_set)
+        time.sleep(min(get_backoff_seconds_for(attempt), seconds_remaining))
+        attempt += 1
 
-    # Messages
-    simple_message_found_slack = f"The following {number_of_affected_users} user(s) meet the requirement (no usage within {day_range} days) for access deletion/ deactivation of at least one of their IAM access methods on AWS account ({account_identification}): • {' • '.join(affected_users_set)}"
-    simple_message_found_local = f"The {number_of_affected_users} user(s) below meet the requirement (no usage within {day_range} days) for access deletion/ deactivation of at least one of their IAM access methods on the AWS account [{account_identification}]"
-    simple_message_not_found = f"No users breach the specified period (no usage within {day_range} days) for access deletion/ deactivation on the AWS account [{account_identification}]"
+    content = response['Content'].decode()
+    context.credential_report_generated_time = response['GeneratedTime'].timestamp()
 
-    # Check to see if slack should be notified
-    if is_notify_slack_mode_set:
-        if  number_of_affected_users > 0:
-            send_to_slack_this(message=simple_message_found_slack)
-    
-    # Print list to terminal
-    if number_of_affected_users > 0:
-        print(simple_message_found_local)
-        for user in affected_users_set:
-            print(f"• {user}")
-    else:
-        print(f"{simple_message_not_found}")
+    # Keep a copy locally for future runs
+    if is_report_cache_usable:
+        save_credential_report_to_cache_for(account_number, response['GeneratedTime'], content)
 
-def all_users_not_using_any_access_methods_from(collections_of_users: dict, display=False) -> list:
-    """Checks through a collection of users and holds (or shows if requested) any users that are not using any of their access methods to AWS account,
-    thus suggesting they can be deleted from the account
+    # Return a list with the information about all the users from report
+    return content.split('\n')
 
-    :param collections_of_users: Collection of users dict
-    :type collections_of_users: dict
-    :param display: Whether function should print to terminal (if not return list)
-    :type display: bool
+def parse_credential_report(report: list) -> list:
+    """Parses the credential report in a single pass, finding each column needed by its header name
+    so the tool keeps working if AWS adds or reorders columns
 
-    :returns: (Optional) List of users not using any access methods
+    :param report: List of the rows in the credential report, starting with the header row
+    :type report: list
+
+    :returns: List of CredentialReportRow, one per user
     :rtype: list
     """
-    global account_identification
-    global is_notify_slack_mode_set
-    number_of_access_methods = 3
+    report_rows = csv.reader(row for row in report if row)
 
-    # Create collection of dict to hold user and of their access method 'null count'
-    dict_of_users_access_method_null_count = collections.defaultdict(dict)
+    # Find where each column sits using the header row
+    try:
+        header = next(report_rows)
+        column_indexes = [header.index(column) for column in CredentialReportRow._fields]
+    except (StopIteration, ValueError):
+        print(f"""ATTENTION:\nThe credential report is missing one or more of the expected columns: {', '.join(CredentialReportRow._fields)}""")
+        exit(1)
 
-    # Loop through users in passed collection and count null occurences in for access methods
-    for user in collections_of_users:
-        # Set counter to 0 for user
-        dict_of_users_access_method_null_count[user] = 0
-        for access_method, value in collections_of_users[user].items():
-            if value == 'null':
-                dict_of_users_access_method_null_count[user] += 1
-    
-    # List of users that will be modified by tool
-    list_of_unused_user_accounts = []
+    user_index, arn_index, password_enabled_index, password_last_used_index, access_key_1_active_index, access_key_1_last_rotated_index, access_key_1_last_used_date_index, access_key_2_active_index, access_key_2_last_rotated_index, access_key_2_last_used_date_index = column_indexes
+
+    return [
+        CredentialReportRow(
+            user=row[user_index],
+            arn=row[arn_index],
+            password_enabled=row[password_enabled_index],
+            password_last_used=row[password_last_used_index],
+            access_key_1_active=row[access_key_1_active_index],
+            access_key_1_last_rotated=row[access_key_1_last_rotated_index],
+            access_key_1_last_used_date=row[access_key_1_last_used_date_index],
+            access_key_2_active=row[access_key_2_active_index],
+            access_key_2_last_rotated=row[access_key_2_last_rotated_index],
+            access_key_2_last_used_date=row[access_key_2_last_used_date_index]
+        )
+        for row in report_rows
+    ]
 
-    # loop through list and see how many users are not using ANY of the access methods
-    for user in dict_of_users_access_method_null_count:
-        if dict_of_users_access_method_null_count[user] == number_of_access_methods:
-            list_of_unused_user_accounts.append(user)
-    
-    # Messages
-    simple_message_found_slack = f"The following user(s) will be permanently removed from AWS account ({account_identification}) on the next `--klean-users` call: • {' • '.join(list_of_unused_user_accounts)}"
-    simple_message_found_local = f"The user(s) below meet the requirement(s) to be permanently removed from AWS account ({account_identification}) on the next `--klean-users` call"
-    simple_message_not_found = f"No users on the AWS account ({account_identification}) breach the specified requirement(s) to be permanently removed."
+def get_credential_report_row_for(context: AccountContext, user_name: str) -> object:
+    """Gets the user's row from the credential report snapshot taken for the account
 
-    # If display True
-    if display:
-        if len(list_of_unused_user_accounts) > 0:
-            print(simple_message_found_local)
-            for user in list_of_unused_user_accounts:
-                print(f"• {user}")
+    :param context: Account context holding the snapshot
+    :type context: AccountContext
+    :param user_name: IAM username
+    :type user_name: str
+
+    :returns: The user's CredentialReportRow or None if there is no snapshot or the user is not in it
+    :rtype: object
+    """
+    if context.credential_report_snapshot is None:
+        return None
+
+    if context.credential_report_snapshot_by_user is None:
+        context.credential_report_snapshot_by_user = {row.user: row for row in context.credential_report_snapshot}
+
+    return context.credential_report_snapshot_by_user.get(user_name)
+
+def get_credential_report_snapshot(context: AccountContext) -> list:
+    """Gets the credential report for the account once per context, so every requested action is
+    evaluated against the same snapshot without generating, fetching or parsing the report again
+
+    :param context: Account context to get the report for
+    :type context: AccountContext
+
+    :returns: List of CredentialReportRow, one per user
+    :rtype: list
+    """
+    if context.credential_report_snapshot is None:
+        warm_report = get_warm_credential_report_for(context.account_identification)
+
+        if warm_report is not None:
+            context.credential_report_snapshot, context.credential_report_generated_time = warm_report
         else:
-            print(simple_message_not_found)
-    
-    # Notify slack of affected user accounts
-    if is_notify_slack_mode_set:
-        if len(list_of_unused_user_accounts) > 0:
-            send_to_slack_this(message=simple_message_found_slack)
+            with time_stage(context, "credential_report"):
+                credential_report = get_all_users_in_aws_account(context)
 
-    # If display not True then return list of affected users
-    if not display:
-        return list_of_unused_user_accounts
+            with time_stage(context, "parse"):
+                context.credential_report_snapshot = parse_credential_report(credential_report)
+
+            keep_credential_report_warm_for(context.account_identification, context.credential_report_snapshot, context.credential_report_generated_time)
+
+        # Compare the report against the one seen on the previous run
+        if state_file:
+            update_user_states_for(context)
+
+    return context.credential_report_snapshot
+
+def get_warm_credential_report_for(account: str) -> tuple:
+    """Gets the parsed credential report held in memory for the account while serving requests,
+    if it is within the report cache TTL
+
+    :param account: The AWS account the report belongs to
+    :type account: str
+
+    :returns: Tuple of the list of CredentialReportRow and when the report was generated (epoch seconds), or None
+    if no usable report is held
+    :rtype: tuple
+    """
+    if warm_credential_reports is None or report_cache_ttl is None or account not in warm_credential_reports:
+        return None
+
+    credential_report, generated_time, fetched_at = warm_credential_reports[account]
+    report_age = time.time() - fetched_at
+
+    if report_age > report_cache_ttl * 60:
+        return None
+
+    print(f"{script_name} is using the credential report held by the server from {int(report_age // 60)} minute(s) ago")
+
+    return credential_report, generated_time
+
+def keep_credential_report_warm_for(account: str, credential_report: list, generated_time: float) -> None:
+    """Holds the parsed credential report in memory for later requests while serving requests
+
+    :param account: The AWS account the report belongs to
+    :type account: str
+    :param credential_report: List of CredentialReportRow, one per user
+    :type credential_report: list
+    :param generated_time: When the report was generated (epoch seconds)
+    :type generated_time: float
+
+    :returns: None
+    """
+    # Only hold reports for accounts that could be identified
+    if warm_credential_reports is not None and report_cache_ttl is not None and account and not account.startswith("N/A"):
+        warm_credential_reports[account] = (credential_report, generated_time, time.time())
+
+def open_state_store() -> object:
+    """Opens the SQLite file state is kept in between runs, creating its tables the first time
+
+    :returns: Connection to the state file
+    :rtype: object
+    """
+    import sqlite3
+
+    connection = sqlite3.connect(state_file, timeout=30)
+    connection.execute("CREATE TABLE IF NOT EXISTS users (account TEXT, user TEXT, row TEXT, seen_at REAL, PRIMARY KEY (account, user))")
+    connection.execute("CREATE TABLE IF NOT EXISTS actions (account TEXT, user TEXT, access_method TEXT, action TEXT, access_key_id TEXT, row TEXT, acted_at REAL, PRIMARY KEY (account, user, access_method))")
+
+    return connection
+
+def update_user_states_for(context: AccountContext) -> None:
+    """Compares each user's row in the credential report snapshot against the row seen on the previous run,
+    saves the new rows and loads the actions already taken on the account
+
+    :param context: Account context holding the snapshot
+    :type context: AccountContext
+
+    :returns: None
+    """
+    account_identification = context.account_identification
+
+    # Only keep state for accounts that could be identified
+    if not account_identification or account_identification.startswith("N/A"):
+        return
+
+    current_rows = {row.user: ",".join(row) for row in context.credential_report_snapshot}
+
+    with contextlib.closing(open_state_store()) as connection, connection:
+        previous_rows = dict(connection.execute("SELECT user, row FROM users WHERE account = ?", (account_identification,)))
+
+        changed_users = [user for user, row in current_rows.items() if previous_rows.get(user) != row]
+        removed_users = [user for user in previous_rows if user not in current_rows]
+
+        seen_at = time.time()
+        connection.executemany(
+            "INSERT OR REPLACE INTO users (account, user, row, seen_at) VALUES (?, ?, ?, ?)",
+            [(account_identification, user, current_rows[user], seen_at) for user in changed_users]
+        )
+        connection.executemany("DELETE FROM users WHERE account = ? AND user = ?", [(account_identification, user) for user in removed_users])
+        connection.executemany("DELETE FROM actions WHERE account = ? AND user = ?", [(account_identification, user) for user in removed_users])
+
+        context.previous_actions = {
+            (user, access_method): (action, row, acted_at)
+            for user, access_method, action, row, acted_at in connection.execute(
+                "SELECT user, access_method, action, row, acted_at FROM actions WHERE account = ?", (account_identification,)
+            )
+        }
+
+    if previous_rows:
+        print(f"{len(changed_users)} of {len(current_rows)} user(s) have changed since the last run on AWS account {account_identification}")
+
+def is_action_already_taken_on(context: AccountContext, user: str, access_method: str, action: str) -> bool:
+    """Checks whether the action (or a deletion) was already carried out on the user's access method, against
+    the same row of the credential report, on a previous run
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user: IAM username
+    :type user: str
+    :param access_method: The user's access method, e.g. access_key_1_access
+    :type access_method: str
+    :param action: Action that should be carried out
+    :type action: str
+
+    :returns: Whether the action can be skipped
+    :rtype: bool
+    """
+    previous_action = (context.previous_actions or {}).get((user, access_method))
+
+    if previous_action is None:
+        return False
+
+    action_taken, row, acted_at = previous_action
+    report_row = get_credential_report_row_for(context, user)
+
+    # A report generated after the action that still shows the method in use means it was turned back on
+    if report_row is None or ",".join(report_row) != row:
+        return False
+
+    if context.credential_report_generated_time is not None and context.credential_report_generated_time > acted_at:
+        return False
+
+    return action_taken in (action, "delete")
+
+def remove_actions_already_taken_from(context: AccountContext, users_collection: dict, action: str) -> dict:
+    """Removes the access methods the action was already carried out on from the users collection
+
+    :param context: Account context the users belong to
+    :type context: AccountContext
+    :param users_collection: Dict of users, each its own dict containing information about user's methods of access status
+    :type users_collection: dict
+    :param action: Action that should be carried out
+    :type action: str
+
+    :returns: Dict of users with the access methods already actioned set to False
+    :rtype: dict
+    """
+    if not context.previous_actions:
+        return users_collection
+
+    remaining_users_collection = {}
+    number_of_skipped_access_methods = 0
+
+    for user, access_methods in users_collection.items():
+        remaining_users_collection[user] = {}
+
+        for access_method, value in access_methods.items():
+            if value and value != 'null' and is_action_already_taken_on(context, user, access_method, action):
+                value = False
+                number_of_skipped_access_methods += 1
+
+            remaining_users_collection[user][access_method] = value
+
+    if number_of_skipped_access_methods:
+        print(f"Skipping {number_of_skipped_access_methods} access method(s) already actioned on a previous run on AWS account {context.account_identification}")
+
+    return remaining_users_collection
+
+def record_action_taken_on(context: AccountContext, user: str, access_method: str, action: str, access_key_id: str = None) -> None:
+    """Records the action carried out on the user's access method, to be saved to the state file once remediation finishes
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user: IAM username
+    :type user: str
+    :param access_method: The user's access method, e.g. access_key_1_access
+    :type access_method: str
+    :param action: Action that was carried out
+    :type action: str
+    :param access_key_id: ID of the access key actioned, if any
+    :type access_key_id: str
+
+    :returns: None
+    """
+    if not state_file or is_dry_run_mode_set:
+        return
+
+    report_row = get_credential_report_row_for(context, user)
+    context.actions_taken.append((user, access_method, action, access_key_id, ",".join(report_row) if report_row else None, time.time()))
+
+def save_actions_taken_for(context: AccountContext) -> None:
+    """Saves the actions recorded on the account to the state file
+
+    :param context: Account context holding the actions
+    :type context: AccountContext
+
+    :returns: None
+    """
+    account_identification = context.account_identification
+
+    if not state_file or not context.actions_taken or not account_identification or account_identification.startswith("N/A"):
+        return
+
+    with contextlib.closing(open_state_store()) as connection, connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO actions (account, user, access_method, action, access_key_id, row, acted_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(account_identification,) + action_taken for action_taken in context.actions_taken]
+        )
+
+    context.actions_taken = []
+
+def is_in_report_timestamp_format(string: str) -> bool:
+    """Checks whether the passed string is a timestamp in the fixed format used by the credential report,
+    e.g. 2019-06-10T09:43:02+00:00. Timestamps in this format sort correctly when compared as strings
+
+    :param string: Date written as string
+    :type string: str
+
+    :returns: Whether the string is in the credential report timestamp format
+    :rtype: bool
+    """
+    return len(string) == 25 and string[10] == "T" and string.endswith("+00:00")
+
+def convert_this_to_date(string: str = "") -> object:
+    """Converts passed string to a date object. Timestamps in the fixed format used by the credential
+    report (e.g. 2019-06-10T09:43:02+00:00) are converted directly, anything else is passed to dateutil
+
+    :param string: Date written as string
+    :type string: str
+
+    :returns: Date object
+    :rtype object
+    """
+    if is_in_report_timestamp_format(string):
+        try:
+            return datetime.datetime(
+                int(string[0:4]), int(string[5:7]), int(string[8:10]),
+                int(string[11:13]), int(string[14:16]), int(string[17:19]),
+                tzinfo=utc_timezone
+            )
+        except ValueError:
+            pass
+
+    import dateutil.parser
+
+    return dateutil.parser.parse(string)
+
+def load_super_users_file_from(destination: str) -> dict:
+    """Gets the superuser file dependant on destination passed
+
+    :param destination: How the script should attempt to load th file, locally or remotely.
+    :type string
+
+    :returns: Dict containing list of super user IAM user names
+    :rtype dict
+    """
+    global super_user_file_name
+    global script_location
+    global super_user_file_url
+    super_users_data = None
+
+    if destination == "local":
+        # Open file
+        with open(f"{script_location}/{super_user_file_name}", "r") as file:
+            super_users_data=file.read().strip()
+            super_users_data=json.loads(super_users_data)
+        
+        return super_users_data
+    elif destination == "remote":
+        import requests
+
+        url = super_user_file_url_override_url if super_user_file_url_override_url else super_user_file_url
+        metadata = load_super_users_file_metadata()
+
+        # Only treat the local copy as a cache if it was downloaded from the same URL
+        has_local_copy = os.path.exists(f"{script_location}/{super_user_file_name}") and metadata.get("url") == url
+
+        # Use the local copy without going to the network while it is within the TTL
+        if has_local_copy and (time.time() - metadata.get("fetched_at", 0)) < (super_user_file_ttl * 60):
+            return load_super_users_file_from(destination="local")
+
+        # Ask the server to only send the file if it has changed
+        headers = {}
+        if has_local_copy:
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        # Download file from URL
+        try:
+            response = requests.get(url, headers=headers, timeout=super_user_file_request_timeout)
+        except requests.exceptions.RequestException:
+            response = None
+
+        if response is not None and response.status_code == 304 and has_local_copy:
+            # Local copy is still current
+            pass
+        elif response is not None and response.status_code == 200:
+            # Write content of URL body to file, via a temporary file so other runs never read half a file
+            temporary_path = f"{script_location}/{super_user_file_name}.{os.getpid()}.tmp"
+            with open(temporary_path, "w") as file:
+                file.write(response.text)
+            os.replace(temporary_path, f"{script_location}/{super_user_file_name}")
+
+            metadata = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")
+            }
+        elif has_local_copy:
+            # Fall back to the stale copy, leaving its fetch time untouched so the next run tries again
+            print(f"""ATTENTION:\nCould not GET from: {url}, using the copy downloaded {int((time.time() - metadata.get("fetched_at", 0)) // 60)} minute(s) ago""")
+            return load_super_users_file_from(destination="local")
+        else:
+            raise Exception(f"Could not GET from: {url}")
+
+        metadata["fetched_at"] = time.time()
+        save_super_users_file_metadata(metadata)
+
+        # Return the dict loaded from the function
+        return load_super_users_file_from(destination="local")
+
+def load_super_users_file_metadata() -> dict:
+    """Loads the metadata (URL, ETag, Last-Modified and fetch time) kept next to a downloaded super user file
+
+    :param None
+
+    :returns: Dict of metadata, empty if the super user file was not downloaded by the tool
+    :rtype dict
+    """
+    try:
+        with open(f"{script_location}/{super_user_file_name}.meta", "r") as file:
+            return json.load(file)
+    except (IOError, ValueError):
+        return {}
+
+def save_super_users_file_metadata(metadata: dict) -> None:
+    """Saves the metadata for a downloaded super user file next to it
+
+    :param metadata: Dict holding the URL, ETag, Last-Modified and fetch time
+    :type metadata: dict
+
+    :returns: None
+    """
+    with open(f"{script_location}/{super_user_file_name}.meta", "w") as file:
+        json.dump(metadata, file)
+
+def get_super_users_dict() -> dict:
+    """Gets the dict which holds the list of super users (AWS IAM user accounts to ignore). Loads locally if present 
+    otherwise pulls from remote location/ URL. Copies downloaded by the tool are revalidated once their TTL has passed
+
+    :param None
+
+    :returns: dict of superusers
+    :rtype dict
+    """
+    # Hand maintained local files are used as-is, anything downloaded or overridden goes through the remote cache
+    is_super_user_file_remote = (
+        super_user_file_url_override_url
+        or os.path.exists(f"{script_location}/{super_user_file_name}.meta")
+        or not os.path.exists(f"{script_location}/{super_user_file_name}")
+    )
+
+    # Attempt to load super user file locally
+    try:
+        dict_of_super_users = load_super_users_file_from(destination = "local")
+    except IOError:
+        dict_of_super_users = None
+
+    if is_super_user_file_remote or dict_of_super_users is None:
+        try:
+            dict_of_super_users = load_super_users_file_from(destination = "remote")
+        except:
+            print(f"""ATTENTION:\nPlease save a json file named {super_user_file_name} in {script_location} with a file body as follows:""")
+            print("""
+{
+    "superUsers" : [
+        "<root_account>",
+	"awsklean",
+        "[AWS IAM user name]"
+    ]
+}
+""")
+            print("""
+- [AWS IAM user name] can be multiple users comma separated using JSON forrmatting
+""")
+            exit(1)
+    
+    return dict_of_super_users
+
+def build_super_user_matcher_from(dict_of_super_users: dict) -> object:
+    """Compiles the super users dict into a single function used to check whether an IAM user should be ignored.
+    Besides exact user names under 'superUsers', the dict can hold glob patterns (e.g. svc-*) under
+    'superUserPatterns', regular expressions (matched from the start of the user name) under 'superUserRegex'
+    and IAM path prefixes (e.g. /automation/) under 'superUserPaths'
+
+    :param dict_of_super_users: Dict loaded from the super users file
+    :type dict_of_super_users: dict
+
+    :returns: Function taking a user name and ARN, returning whether the user is a super user
+    :rtype: object
+    """
+    super_user_names = frozenset(dict_of_super_users.get('superUsers', []))
+
+    # Combine every glob and regular expression into one pattern, so each user is only matched once
+    super_user_expressions = [fnmatch.translate(pattern) for pattern in dict_of_super_users.get('superUserPatterns', [])]
+
+    for expression in dict_of_super_users.get('superUserRegex', []):
+        try:
+            re.compile(expression)
+        except (re.error, TypeError) as err:
+            print(f"""ATTENTION: \nThe regular expression "{expression}" under 'superUserRegex' in {super_user_file_name} is not valid. \n\t- {str(err)}""")
+            exit(1)
+
+        # Flags such as (?i) only apply to the whole pattern, so limit them to their own expression before combining
+        leading_flags = re.match(r"\(\?([aimsux]+)\)", expression)
+        if leading_flags:
+            expression = f"(?{leading_flags.group(1)}:{expression[leading_flags.end():]})"
+
+        super_user_expressions.append(expression)
+
+    super_user_pattern = re.compile("|".join(f"(?:{expression})" for expression in super_user_expressions)) if super_user_expressions else None
+
+    super_user_paths = tuple(
+        f"/{path.strip('/')}/".replace("//", "/")
+        for path in dict_of_super_users.get('superUserPaths', [])
+    )
+
+    def is_super_user(user_name: str, arn: str = "") -> bool:
+        """Checks the user name and the path in its ARN against the super users"""
+        if user_name in super_user_names:
+            return True
+
+        if super_user_pattern and super_user_pattern.match(user_name):
+            return True
+
+        # ARNs look like arn:aws:iam::111122223333:user/path/to/user_name
+        if super_user_paths and ":user/" in arn:
+            user_path = arn.split(":user", 1)[1]
+            return user_path.startswith(super_user_paths)
+
+        return False
+
+    return is_super_user
+
+def get_super_user_matcher() -> object:
+    """Gets the super user matcher, loading the super users and compiling the matcher only on the first call of the run
+
+    :param None
+
+    :returns: Function taking a user name and ARN, returning whether the user is a super user
+    :rtype: object
+    """
+    global super_user_matcher
+
+    if super_user_matcher is None:
+        super_user_matcher = build_super_user_matcher_from(get_super_users_dict())
+
+    return super_user_matcher
+
+class RecordWriter:
+    """Writes one machine readable record per user to the stream as soon as the user is checked, as NDJSON,
+    CSV or a JSON array. Safe to use from several threads, so accounts swept at the same time share one stream
+
+    :param stream: Stream to write the records to
+    :type stream: object
+    :param output_format: One of ndjson, csv or json
+    :type output_format: str
+    """
+    fields = ["account", "account_identification", "check", "days", "user", "password_access", "access_key_1_access", "access_key_2_access"]
+
+    def __init__(self, stream: object, output_format: str):
+        self.stream = stream
+        self.output_format = output_format
+        self.lock = threading.Lock()
+        self.number_of_records = 0
+        self.is_closed = False
+
+        if output_format == "csv":
+            self.csv_writer = csv.writer(stream, lineterminator="\n")
+            self.csv_writer.writerow(self.fields)
+        elif output_format == "json":
+            stream.write("[")
+
+    def write_record(self, context: AccountContext, check: str, days: int, user: str, access_methods: dict) -> None:
+        """Writes the record for a user, with the account number of the AWS account followed by its alias
+
+        :param context: Account context the user belongs to
+        :type context: AccountContext
+        :param check: The check the user was found by: show, list or list-to-be-kleaned
+        :type check: str
+        :param days: The number of days the check looked back over, if any
+        :type days: int
+        :param user: IAM username
+        :type user: str
+        :param access_methods: Dict of the user's methods of access and their status
+        :type access_methods: dict
+
+        :returns: None
+        """
+        # 'null' means the access method is not enabled, written as JSON null
+        statuses = [None if access_methods.get(access_method) == 'null' else access_methods.get(access_method) for access_method in self.fields[5:]]
+
+        # Aliases are optional and lookups that fail all look the same, so records are told apart by account number
+        account = get_account_number_for(context)
+        account_identification = context.account_identification
+
+        with self.lock:
+            if self.output_format == "csv":
+                self.csv_writer.writerow([account or "", account_identification or "", check, days if days is not None else ""] + [user] + ["null" if status is None else str(status).lower() for status in statuses])
+            else:
+                record = json.dumps(dict(zip(self.fields, [account, account_identification, check, days, user] + statuses)))
+
+                if self.output_format == "json":
+                    self.stream.write(f"{',' if self.number_of_records else ''}\n    {record}")
+                else:
+                    self.stream.write(f"{record}\n")
+
+            self.number_of_records += 1
+
+    def close(self) -> None:
+        """Finishes the output, closing the JSON array if there is one
+
+        :returns: None
+        """
+        with self.lock:
+            if self.is_closed:
+                return
+
+            if self.output_format == "json":
+                self.stream.write("\n]\n")
+
+            self.stream.flush()
+            self.is_closed = True
+
+class UserAccessCollection(collections.abc.Mapping):
+    """Compact, column by column store of the users found by a check and the status of each of their access methods.
+    User names are interned and kept once, in the order they were checked, and each access method keeps a single
+    byte per user holding its status code (used_status, unused_status or not_enabled_status). Reads like the dict of
+    dicts it replaces, e.g. collection["bob"] == {'password_access': True, 'access_key_1_access': 'null', ...},
+    while the set queries work on whole columns at once
+    """
+    def __init__(self):
+        self.users = []
+        self.user_positions = None
+        self.statuses = {access_method: bytearray() for access_method in access_method_names}
+
+    @classmethod
+    def from_dict(cls, collections_of_users: dict) -> "UserAccessCollection":
+        """Builds a collection from a dict of users, each its own dict of their access methods and status
+
+        :param collections_of_users: Collection of users dict
+        :type collections_of_users: dict
+
+        :returns: The collection
+        :rtype: UserAccessCollection
+        """
+        if isinstance(collections_of_users, cls):
+            return collections_of_users
+
+        collection = cls()
+        for user, access_methods in collections_of_users.items():
+            collection.add(user, *(get_status_code_for(access_methods.get(access_method, 'null')) for access_method in access_method_names))
+
+        return collection
+
+    def add(self, user: str, password_status: int, access_key_1_status: int, access_key_2_status: int) -> None:
+        """Adds a user and the status code of each of their access methods
+
+        :returns: None
+        """
+        self.users.append(sys.intern(user))
+        self.statuses["password_access"].append(password_status)
+        self.statuses["access_key_1_access"].append(access_key_1_status)
+        self.statuses["access_key_2_access"].append(access_key_2_status)
+        self.user_positions = None
+
+    def __getitem__(self, user: str) -> dict:
+        # Only index the users by name the first time a user is looked up by name
+        if self.user_positions is None:
+            self.user_positions = {name: position for position, name in enumerate(self.users)}
+
+        return self.get_access_methods_at(self.user_positions[user])
+
+    def __iter__(self):
+        return iter(self.users)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def items(self):
+        return ((user, self.get_access_methods_at(position)) for position, user in enumerate(self.users))
+
+    def get_access_methods_at(self, position: int) -> dict:
+        """Gets the access methods of the user at the position, with their status as True, False or 'null'
+
+        :param position: Position of the user in the collection
+        :type position: int
+
+        :returns: Dict of the user's access methods and their status
+        :rtype: dict
+        """
+        return {access_method: access_method_statuses[self.statuses[access_method][position]] for access_method in access_method_names}
+
+    def get_mask_for(self, access_method: str, status_code: int) -> int:
+        """Gets a mask of the users whose access method has the status, as an int holding a byte per user (1 if it does, 0 if not),
+        so masks for different access methods can be combined with & and | a whole column at a time
+
+        :param access_method: The access method, e.g. password_access
+        :type access_method: str
+        :param status_code: used_status, unused_status or not_enabled_status
+        :type status_code: int
+
+        :returns: The mask
+        :rtype: int
+        """
+        is_status = bytes(1 if code == status_code else 0 for code in range(256))
+
+        return int.from_bytes(self.statuses[access_method].translate(is_status), "little")
+
+    def get_users_in(self, mask: int) -> list:
+        """Gets the users set in the mask, in the order they were checked
+
+        :param mask: Mask with a byte per user
+        :type mask: int
+
+        :returns: List of users
+        :rtype: list
+        """
+        mask_bytes = mask.to_bytes(len(self.users), "little")
+        users = []
+        position = mask_bytes.find(1)
+
+        while position != -1:
+            users.append(self.users[position])
+            position = mask_bytes.find(1, position + 1)
+
+        return users
+
+    def get_users_with_an_unused_access_method(self) -> list:
+        """Gets the users with at least one access method not used within the days checked
+
+        :returns: List of users
+        :rtype: list
+        """
+        mask = 0
+        for access_method in access_method_names:
+            mask |= self.get_mask_for(access_method, unused_status)
+
+        return self.get_users_in(mask)
+
+    def get_users_not_using_any_access_methods(self) -> list:
+        """Gets the users without any of their access methods enabled
+
+        :returns: List of users
+        :rtype: list
+        """
+        mask = -1
+        for access_method in access_method_names:
+            mask &= self.get_mask_for(access_method, not_enabled_status)
+
+        return self.get_users_in(mask) if self.users else []
+
+def get_status_code_for(status: object) -> int:
+    """Gets the status code kept by UserAccessCollection for an access method's status
+
+    :param status: True, False or 'null'
+    :type status: object
+
+    :returns: used_status, unused_status or not_enabled_status
+    :rtype: int
+    """
+    if status == 'null':
+        return not_enabled_status
+
+    return unused_status if status else used_status
+
+def get_all_users_not_used_in_the_last(context: AccountContext, number_of_days: int = 60, source_report: list = None, display=False):
+    """Checks to see if any user accounts in the source report have not logged in AWS in specified time.
+    The result is also kept on the account context
+
+    :param context: Account context to check
+    :type context: AccountContext
+    :param days: The number of days before today to check up until
+    :type days: int
+    :param source_report: Function returning the AWS IAM accounts to check, a CredentialReportRow per user.
+    Defaults to the account's credential report snapshot
+    :type list
+    :param display: Whether function should output to the terminal or return list
+
+    :returns: List of user objects that are unused within the specified time
+    """
+
+    number_of_days_as_delta = datetime.timedelta(days=number_of_days)
+
+    # Get current date/time in the same timezone used by AWS system
+    current_date_tzutc = datetime.datetime.now(utc_timezone)
+
+    # Work out the cutoff once, both as a date and in the credential report's own timestamp format
+    cutoff_date = current_date_tzutc - number_of_days_as_delta
+    cutoff_timestamp = cutoff_date.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+    # Report timestamps have no fractions of a second, so one matching the cutoff to the second is older
+    # than the cutoff if the cutoff has any
+    is_cutoff_second_included = cutoff_date.microsecond > 0
+
+    def is_older_than_cutoff(timestamp: str) -> bool:
+        """Compares report timestamps as strings, only converting to a date if AWS uses another format"""
+        if is_in_report_timestamp_format(timestamp):
+            return timestamp < cutoff_timestamp or (is_cutoff_second_included and timestamp == cutoff_timestamp)
+
+        return convert_this_to_date(string=timestamp) < cutoff_date
+
+    # List to hold users who have not been used in specified time
+    list_of_all_aws_users_out_of_range = []
+
+    # Start from an empty collection each call, so results never carry over from a previous check
+    list_of_users_to_action = UserAccessCollection()
+    context.list_of_users_to_action = list_of_users_to_action
+
+    # Matcher for super users, built once per run
+    is_super_user = get_super_user_matcher()
+
+    credential_report = source_report() if source_report else get_credential_report_snapshot(context)
+    classify_started_at = time.perf_counter()
+
+    for user in credential_report:
+        # Make sure user is not super user before adding to list
+        if is_super_user(user.user, user.arn):
+            continue
+
+        # Check if password_enabled is set to 'true'
+        if user.password_enabled == 'true':
+            # Check to see if there is any information on the last time password was used
+            if user.password_last_used == 'no_information':
+                password_access = not_enabled_status
+            # Check if password_last_used is older than the specificed range        
+            elif is_older_than_cutoff(user.password_last_used):
+                list_of_all_aws_users_out_of_range.append(user)
+                password_access = unused_status
+            else:
+                password_access = used_status
+        else:
+            password_access = not_enabled_status
+
+        # Check if access_key_1_active is set to 'true'
+        if user.access_key_1_active == 'true':
+            # Check to see if access_key_last_used_date is NOT 'N/A'
+            if user.access_key_1_last_used_date != 'N/A':
+                # Check to see if access_key_last_used_date is 'no_information'
+                if user.access_key_1_last_used_date == 'no_information':
+                    access_key_1_access = unused_status
+                # Check if access_key_1_last_used_date is older than the specificed range
+                elif is_older_than_cutoff(user.access_key_1_last_used_date):
+                    list_of_all_aws_users_out_of_range.append(user)
+                    access_key_1_access = unused_status
+                else:
+                    access_key_1_access = used_status
+            else:
+                access_key_1_access = unused_status
+        else:
+            access_key_1_access = not_enabled_status
+
+        # Check if access_key_2_active is set to 'true'
+        if user.access_key_2_active == 'true':
+            # Check to see if access_key_2_last_used_date is NOT 'N/A'
+            if user.access_key_2_last_used_date != 'N/A':
+                # Check to see if access_key_2_last_used_date is 'no_information'
+                if user.access_key_2_last_used_date == 'no_information':
+                    access_key_2_access = unused_status
+                # Check if access_key_2_last_used_date is older than the specificed range
+                elif is_older_than_cutoff(user.access_key_2_last_used_date):
+                    list_of_all_aws_users_out_of_range.append(user)
+                    access_key_2_access = unused_status
+                else:
+                    access_key_2_access = used_status
+            else:
+                access_key_2_access = unused_status
+        else:
+            access_key_2_access = not_enabled_status
+
+        # Stream the user straight out when showing machine readable output, rather than holding every user
+        if display and record_writer is not None:
+            record_writer.write_record(context, "show", number_of_days, user.user, {
+                'password_access': access_method_statuses[password_access],
+                'access_key_1_access': access_method_statuses[access_key_1_access],
+                'access_key_2_access': access_method_statuses[access_key_2_access]
+            })
+        else:
+            list_of_users_to_action.add(user.user, password_access, access_key_1_access, access_key_2_access)
+
+    if metrics_collector is not None:
+        metrics_collector.record_stage(get_metrics_account_for(context), "classify", time.perf_counter() - classify_started_at)
+
+    if display:
+        # Print the list of users to terminal, unless it has already been streamed out
+        if record_writer is None:
+            print(json.dumps(dict(list_of_users_to_action.items()), indent=4, separators=(',', ': ')))
+    else:
+        # Return list
+        return list_of_users_to_action
+
+def users_with_at_least_one_unused_access_method_from(context: AccountContext, collections_of_users: dict):
+    """Checks which of the users from the passed collection has at least one access method that failed 
+    preliminary usage test and will be affected if a modifying argument were to be passed.
+
+    :param context: Account context the collection belongs to
+    :type context: AccountContext
+    :param collections_of_users: Collection of users dict
+    :type collections_of_users: dict
+
+    :returns: None
+    """
+    global is_notify_slack_mode_set
+    account_identification = context.account_identification
+    day_range = context.day_range
+
+    # Find the users that have access methods that will be actioned, a whole column at a time
+    collections_of_users = UserAccessCollection.from_dict(collections_of_users)
+    affected_users = collections_of_users.get_users_with_an_unused_access_method()
+
+    # Length of affected users
+    number_of_affected_users = len(affected_users)
+
+    # Messages
+    simple_message_found_slack = f"The following {number_of_affected_users} user(s) meet the requirement (no usage within {day_range} days) for access deletion/ deactivation of at least one of their IAM access methods on AWS account ({account_identification}): • {' • '.join(affected_users)}"
+    simple_message_found_local = f"The {number_of_affected_users} user(s) below meet the requirement (no usage within {day_range} days) for access deletion/ deactivation of at least one of their IAM access methods on the AWS account [{account_identification}]"
+    simple_message_not_found = f"No users breach the specified period (no usage within {day_range} days) for access deletion/ deactivation on the AWS account [{account_identification}]"
+
+    # Check to see if slack should be notified
+    if is_notify_slack_mode_set:
+        if  number_of_affected_users > 0:
+            send_to_slack_this(message=simple_message_found_slack)
+
+    # Write a record per affected user instead when showing machine readable output
+    if record_writer is not None:
+        for user in affected_users:
+            record_writer.write_record(context, "list", day_range, user, collections_of_users[user])
+        return
+
+    # Print list to terminal
+    if number_of_affected_users > 0:
+        print(simple_message_found_local)
+        for user in affected_users:
+            print(f"• {user}")
+    else:
+        print(f"{simple_message_not_found}")
+
+def all_users_not_using_any_access_methods_from(context: AccountContext, collections_of_users: dict, display=False) -> list:
+    """Checks through a collection of users and holds (or shows if requested) any users that are not using any of their access methods to AWS account,
+    thus suggesting they can be deleted from the account
+
+    :param context: Account context the collection belongs to
+    :type context: AccountContext
+    :param collections_of_users: Collection of users dict
+    :type collections_of_users: dict
+    :param display: Whether function should print to terminal (if not return list)
+    :type display: bool
+
+    :returns: (Optional) List of users not using any access methods
+    :rtype: list
+    """
+    global is_notify_slack_mode_set
+    account_identification = context.account_identification
+
+    # List of users that will be modified by tool, those without ANY of the access methods enabled, found a whole column at a time
+    collections_of_users = UserAccessCollection.from_dict(collections_of_users)
+    list_of_unused_user_accounts = collections_of_users.get_users_not_using_any_access_methods()
+    
+    # Messages
+    simple_message_found_slack = f"The following user(s) will be permanently removed from AWS account ({account_identification}) on the next `--klean-users` call: • {' • '.join(list_of_unused_user_accounts)}"
+    simple_message_found_local = f"The user(s) below meet the requirement(s) to be permanently removed from AWS account ({account_identification}) on the next `--klean-users` call"
+    simple_message_not_found = f"No users on the AWS account ({account_identification}) breach the specified requirement(s) to be permanently removed."
+
+    # If display True, writing a record per user instead when showing machine readable output
+    if display and record_writer is not None:
+        for user in list_of_unused_user_accounts:
+            record_writer.write_record(context, "list-to-be-kleaned", None, user, collections_of_users[user])
+    elif display:
+        if len(list_of_unused_user_accounts) > 0:
+            print(simple_message_found_local)
+            for user in list_of_unused_user_accounts:
+                print(f"• {user}")
+        else:
+            print(simple_message_not_found)
+    
+    # Notify slack of affected user accounts
+    if is_notify_slack_mode_set:
+        if len(list_of_unused_user_accounts) > 0:
+            send_to_slack_this(message=simple_message_found_slack)
+
+    # If display not True then return list of affected users
+    if not display:
+        return list_of_unused_user_accounts
+
+class TokenBucket:
+    """Token bucket used to keep calls under a rate, shared between threads
+
+    :param rate: Number of tokens added per second
+    :type rate: float
+    :param capacity: Most tokens the bucket can hold, i.e. the largest burst allowed
+    :type capacity: float
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Takes a token from the bucket, waiting for one to be added if it is empty
+
+        :returns: None
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + ((now - self.last_refill) * self.rate))
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                seconds_to_wait = (1 - self.tokens) / self.rate
+
+            time.sleep(seconds_to_wait)
+
+def get_iam_mutation_rate_limiter(context: AccountContext) -> TokenBucket:
+    """Gets the token bucket shared by every IAM change made on the account, creating it on the first call
+
+    :param context: Account context the changes are made on
+    :type context: AccountContext
+
+    :returns: Token bucket limiting IAM changes to the mutation rate
+    :rtype: TokenBucket
+    """
+    global iam_mutations_per_second
+
+    if context.iam_mutation_rate_limiter is None:
+        # The bucket must be able to hold a whole token, otherwise rates below 1 per second would never allow a call
+        context.iam_mutation_rate_limiter = TokenBucket(rate=iam_mutations_per_second, capacity=max(1.0, iam_mutations_per_second))
+
+    return context.iam_mutation_rate_limiter
+
+def call_iam_mutation(context: AccountContext, operation: object, **kwargs) -> dict:
+    """Calls an IAM operation that modifies the account, keeping under the mutation rate limit and retrying
+    with backoff if AWS throttles the call
+
+    :param context: Account context the change is made on
+    :type context: AccountContext
+    :param operation: The IAM client method to call
+    :type operation: object
+    :param kwargs: Arguments to pass to the operation
+
+    :returns: Response from the operation
+    :rtype: dict
+    """
+    global iam_mutation_max_attempts
+    import botocore
+
+    for attempt in range(iam_mutation_max_attempts):
+        get_iam_mutation_rate_limiter(context).acquire()
+
+        try:
+            return operation(**kwargs)
+        except botocore.exceptions.ClientError as err:
+            if err.response.get('Error', {}).get('Code') not in iam_throttling_error_codes or attempt == iam_mutation_max_attempts - 1:
+                raise
+
+            time.sleep(get_backoff_seconds_for(attempt))
+
+def remove_password_access_for(context: AccountContext, user_name: str):
+    """Deletes the console access to AWS account for passed IAM username
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user_name: IAM username
+    :user_name: str
+
+    :returns: None
+    """
+    account_identification = context.account_identification
+
+    # Leave the change to --apply when planning
+    if remediation_plan_file:
+        plan_operation_for(context, user_name, 'password_access', 'delete')
+        return
+
+    # Generate simple message
+    simple_message=f"DELETED CONSOLE ACCESS FOR {user_name} ON AWS ACCOUNT {account_identification}"
+    
+    # Check if dry run mode set and whether slack needs to be notified
+    if is_dry_run_mode_set:
+        dry_run_setup(message=simple_message)
+        if is_notify_slack_mode_set:
+            send_to_slack_this(message=dry_run_setup(message=simple_message, forward=True))
+    else:
+        # Check if notify slack set and act accordingly
+        if is_notify_slack_mode_set:
+            send_to_slack_this(message=f"{user_name}'s Console Access has been revoked on AWS account ({account_identification}).")
+        
+        # Print to terminal
+        live_mode_print(message=simple_message)
+
+        call_iam_mutation(
+            context,
+            context.iam_client.delete_login_profile,
+            UserName=user_name,
+        )
+
+    record_action_taken_on(context, user_name, 'password_access', 'delete')
+
+def get_access_keys_for(context: AccountContext, user_name: str) -> list:
+    """Gets the access keys for the passed IAM user, calling list_access_keys only the first time the user
+    is looked up on the account
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user_name: IAM username
+    :type user_name: str
+
+    :returns: List of access key metadata for the user
+    :rtype: list
+    """
+    access_key_index = context.access_key_index
+
+    if user_name not in access_key_index:
+        access_key_index[user_name] = []
+
+        access_key_infomation_paginator = context.iam_client.get_paginator('list_access_keys')
+        for information in access_key_infomation_paginator.paginate(UserName=user_name):
+            access_key_index[user_name].extend(information['AccessKeyMetadata'])
+
+    return access_key_index[user_name]
+
+def find_access_key_for(context: AccountContext, user_name: str, access_key_number: int, user_access_keys: list) -> dict:
+    """Finds which of the user's access keys is access_key_1 or access_key_2 in the credential report, by matching
+    the key's creation date to the report's last rotated time for that key
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user_name: IAM username
+    :type user_name: str
+    :param access_key_number: Whether to find access_key_1 or access_key_2
+    :type access_key_number: int
+    :param user_access_keys: List of access key metadata for the user
+    :type user_access_keys: list
+
+    :returns: The matching access key metadata or None if no key matches
+    :rtype: dict
+    """
+    report_row = get_credential_report_row_for(context, user_name)
+
+    # Without a report row to go by, fall back to the order AWS lists the keys in
+    if report_row is None:
+        return user_access_keys[access_key_number - 1] if len(user_access_keys) >= access_key_number else None
+
+    last_rotated = report_row.access_key_1_last_rotated if access_key_number == 1 else report_row.access_key_2_last_rotated
+
+    matching_access_keys = [
+        access_key for access_key in user_access_keys
+        if access_key['CreateDate'].astimezone(utc_timezone).strftime("%Y-%m-%dT%H:%M:%S+00:00") == last_rotated
+    ]
+
+    # Both keys can only match if they were created in the same second, then go by the order AWS lists them in
+    if len(matching_access_keys) > 1 and len(user_access_keys) >= access_key_number:
+        return user_access_keys[access_key_number - 1]
+
+    return matching_access_keys[0] if matching_access_keys else None
+
+def carry_out_action_on_access_key(context: AccountContext, user_name: str, access_key_id: str, action: str) -> None:
+    """Acts the passed action ("deactivate" or "delete") on the named access key for the stated user
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user_name: IAM username
+    :type user_name: str
+    :param access_key_id: ID of the access key
+    :type access_key_id: str
+    :param action: Specify whether function should "delete" or "deactivate" the access key
+    :type action: str
+
+    :returns: None
+    """
+    account_identification = context.account_identification
+
+    if action == "deactivate":
+        # Generate simple message
+        simple_message=f"DEACTIVATED KEY {access_key_id} FOR {user_name} ON AWS ACCOUNT {account_identification}"
+
+        # Check if dry run mode set and whether slack needs to be notified
+        if is_dry_run_mode_set:
+            dry_run_setup(message=simple_message)
+            if is_notify_slack_mode_set:
+                send_to_slack_this(message=dry_run_setup(message=simple_message, forward=True))
+        else:
+            # Check if notify slack set and act accordingly
+            if is_notify_slack_mode_set:
+                send_to_slack_this(message=f"{user_name}'s Access Key ({access_key_id}) has been deactivated on AWS account ({account_identification}).")
+
+            # Print to terminal
+            live_mode_print(message=simple_message)
+
+            # Deactivate access key
+            call_iam_mutation(
+                context,
+                context.iam_client.update_access_key,
+                AccessKeyId=access_key_id,
+                Status='Inactive',
+                UserName=user_name
+            )
+
+    elif action == "delete":
+         # Generate simple message
+        simple_message=f"DELETED KEY {access_key_id} FOR {user_name} ON AWS ACCOUNT {account_identification}"
+
+        # Check if dry run mode set and whether slack needs to be notified
+        if is_dry_run_mode_set:
+            dry_run_setup(message=simple_message)
+            if is_notify_slack_mode_set:
+                send_to_slack_this(message=dry_run_setup(message=simple_message, forward=True))
+        else:
+            # Check if notify slack set and act accordingly
+            if is_notify_slack_mode_set:
+                send_to_slack_this(message=f"{user_name}'s Access Key ({access_key_id}) has been deleted on AWS account ({account_identification}).")
+
+            # Print to terminal
+            live_mode_print(message=simple_message)
+
+            # Delete access key
+            call_iam_mutation(
+                context,
+                context.iam_client.delete_access_key,
+                AccessKeyId=access_key_id,
+                UserName=user_name
+            )
+
+def alter_access_key_for(context: AccountContext, user_name: str, access_key_number: int, action: str):
+    """Modifys the access key(s) for passed IAM user. It can remove or deactivate dependant on action passed.
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user_name: IAM username
+    :type user_name: str
+    :param access_key_number: Use to specify the access key on the user's account which should be modified
+    :type access_key_number: int
+    :param action: Specify whether function should "delete" or "deactivate" the access key
+    :type action: str
+
+    :returns: None
+    """
+    account_identification = context.account_identification
+
+    # Get the user's access keys from the per run index
+    user_access_keys = get_access_keys_for(context, user_name)
+
+    # Check to make sure Access Key information exists
+    if not user_access_keys:
+        print(f"No access key information can be found for user {user_name} on AWS account {account_identification}" )
+        return ""
+    
+    # Verb creator
+    verb = "deactiving" if (action == "deactivate") else "deleting"
+
+    # Find the access key the report refers to
+    access_key = find_access_key_for(context, user_name, access_key_number, user_access_keys)
+
+    if not access_key:
+        print(f"Unable to match access_key_{access_key_number} in the credential report to an access key for user ({user_name}) on AWS account {account_identification}, skipping")
+        return ""
+
+    # Nothing to do for keys that are already inactive
+    if action == "deactivate" and access_key.get('Status') == 'Inactive':
+        print(f"access_key_{access_key_number} {access_key['AccessKeyId']} for user ({user_name}) is already inactive on AWS account {account_identification}")
+        record_action_taken_on(context, user_name, f"access_key_{access_key_number}_access", action, access_key['AccessKeyId'])
+        return ""
+
+    # Leave the change to --apply when planning
+    if remediation_plan_file:
+        plan_operation_for(context, user_name, f"access_key_{access_key_number}_access", action, access_key['AccessKeyId'])
+        return ""
+
+    print(f"{verb} access_key_{access_key_number} {access_key['AccessKeyId']} for user ({user_name}) on AWS account {account_identification}")
+    carry_out_action_on_access_key(context, user_name, access_key['AccessKeyId'], action)
+    record_action_taken_on(context, user_name, f"access_key_{access_key_number}_access", action, access_key['AccessKeyId'])
+
+    # Keep the index in step with the change made
+    if not is_dry_run_mode_set:
+        if action == "deactivate":
+            access_key['Status'] = 'Inactive'
+        elif action == "delete":
+            user_access_keys.remove(access_key)
+
+def carry_out_action_on_user(context: AccountContext, user: str, access_methods: dict, action: str) -> None:
+    """Runs passed action against each of the user's methods of access that is 'True', one after the other
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user: IAM username
+    :type user: str
+    :param access_methods: Dict of the user's methods of access and their status
+    :type access_methods: dict
+    :param action: Action that should be carried out
+    :type action: str
+
+    :returns: None
+    """
+    for access_method, value in access_methods.items():
+        # Make sure the value is only True, and not 'null' as non-empty strings are seen as a truthy
+        if value and value != 'null':
+            if access_method == 'access_key_1_access':
+                # Check which action is passed
+                if action == 'delete':
+                    alter_access_key_for( context, user_name = user, access_key_number=1, action=action )
+                if action == 'deactivate':
+                    alter_access_key_for( context, user_name = user, access_key_number=1, action=action )
+            elif access_method == 'access_key_2_access':
+                # Check which action is passed
+                if action == 'delete':
+                    alter_access_key_for( context, user_name = user, access_key_number=2, action=action )
+                if action == 'deactivate':
+                    alter_access_key_for( context, user_name = user, access_key_number=2, action=action )
+            elif access_method == 'password_access':
+                # AWS IAM passwords can only be deleted
+                remove_password_access_for(context, user_name = user)
+
+class ThreadOutputRouter:
+    """Stands in for sys.stdout, sending what each thread prints to the stream that thread redirected to,
+    or to the terminal otherwise. Used so accounts swept at the same time keep their output apart
+
+    :param terminal: Stream to print to when the thread has not redirected its output
+    :type terminal: object
+    """
+    def __init__(self, terminal: object):
+        self.terminal = terminal
+        self.streams = threading.local()
+
+    def get_stream(self) -> object:
+        """Gets the stream the current thread prints to
+
+        :returns: The current thread's stream
+        :rtype: object
+        """
+        return getattr(self.streams, "stream", None) or self.terminal
+
+    @contextlib.contextmanager
+    def redirect_to(self, stream: object):
+        """Sends what the current thread prints to the passed stream until the block exits
+
+        :param stream: Stream to print to
+        :type stream: object
+        """
+        previous_stream = getattr(self.streams, "stream", None)
+        self.streams.stream = stream
+
+        try:
+            yield stream
+        finally:
+            self.streams.stream = previous_stream
+
+    def write(self, text: str) -> int:
+        return self.get_stream().write(text)
+
+    def flush(self) -> None:
+        self.get_stream().flush()
+
+def with_output_of_this_thread(function: object) -> object:
+    """Wraps the function so, when it is run on a worker thread, it prints wherever the calling thread prints
+
+    :param function: Function to wrap
+    :type function: object
+
+    :returns: The wrapped function, or the function itself if output is not being routed per thread
+    :rtype: object
+    """
+    output_router = sys.stdout
+
+    if not isinstance(output_router, ThreadOutputRouter):
+        return function
+
+    stream = output_router.get_stream()
+
+    def run_with_output_of_calling_thread(*args, **kwargs):
+        with output_router.redirect_to(stream):
+            return function(*args, **kwargs)
+
+    return run_with_output_of_calling_thread
+
+async def carry_out_action_on_users_asynchronously_in(context: AccountContext, users_collection: dict, action: str) -> None:
+    """Runs passed action against every user in the collection as concurrent asyncio tasks, bounded by a semaphore.
+    Blocking boto3 calls are offloaded to a thread pool the same size as the semaphore
+
+    :param context: Account context the users belong to
+    :type context: AccountContext
+    :param users_collection: Dict of users, each its own dict containing information about user's methods of access status
+    :type users_collection: dict
+    :param action: Action that should be carried out
+    :type action: str
+
+    :returns: None
+    """
+    import asyncio
+    import concurrent.futures
+
+    semaphore = asyncio.Semaphore(asyncio_concurrency)
+    loop = asyncio.get_event_loop()
+    carry_out_action = with_output_of_this_thread(carry_out_action_on_user)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=asyncio_concurrency) as executor:
+        async def carry_out_action_on_user_asynchronously(user: str):
+            async with semaphore:
+                await loop.run_in_executor(executor, carry_out_action, context, user, users_collection[user], action)
+
+        await asyncio.gather(*(carry_out_action_on_user_asynchronously(user) for user in users_collection.keys()))
+
+def run_asynchronously(coroutine: object) -> object:
+    """Runs the coroutine to completion on a new event loop (asyncio.run is not available on Python 3.6)
+
+    :param coroutine: Coroutine to run
+    :type coroutine: object
+
+    :returns: The coroutine's result
+    :rtype: object
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+def carry_out_action_on_users_in(context: AccountContext, users_collection: dict, action = ""):
+    """Runs passed action against any user's methods of access in the users collection that is 'True'
+
+    :param context: Account context the users belong to
+    :type context: AccountContext
+    :param users_collection: Dict of users, each its own dict containing information about user's methods of access status
+    :type users_collection: dict
+    :param action: Action that should be carried out
+    :type action: str
+
+    :returns: None
+    """
+    global remediation_workers
+    global is_asyncio_mode_set
+
+    # Create the shared rate limiter before any worker threads start
+    get_iam_mutation_rate_limiter(context)
+
+    # Leave out anything already actioned on a previous run
+    if state_file:
+        users_collection = remove_actions_already_taken_from(context, users_collection, action)
+
+    with time_stage(context, "remediate"):
+        # Loop through user collection and see what should be actioned
+        if is_asyncio_mode_set:
+            run_asynchronously(carry_out_action_on_users_asynchronously_in(context, users_collection, action))
+        elif remediation_workers <= 1:
+            for user in users_collection.keys():
+                carry_out_action_on_user(context, user, users_collection[user], action)
+        else:
+            import concurrent.futures
+
+            carry_out_action = with_output_of_this_thread(carry_out_action_on_user)
+
+            # Work on several users at once, each user's access methods are still actioned in order
+            with concurrent.futures.ThreadPoolExecutor(max_workers=remediation_workers) as executor:
+                futures = [executor.submit(carry_out_action, context, user, users_collection[user], action) for user in users_collection.keys()]
+
+                for future in futures:
+                    future.result()
+
+    save_actions_taken_for(context)
+
+def plan_operation_for(context: AccountContext, user_name: str, access_method: str, action: str, access_key_id: str = None) -> None:
+    """Adds the action on the user's access method to the remediation plan instead of carrying it out
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param user_name: IAM username
+    :type user_name: str
+    :param access_method: The user's access method, e.g. access_key_1_access
+    :type access_method: str
+    :param action: Action that should be carried out
+    :type action: str
+    :param access_key_id: ID of the access key to action, None for the login profile
+    :type access_key_id: str
+
+    :returns: None
+    """
+    target = access_key_id if access_key_id else "login-profile"
+    operation_key = (context.account_number, user_name, target, action)
+
+    with remediation_plan_lock:
+        # Login profiles are deleted by both -d and -D, only plan it once
+        if operation_key in planned_operation_keys:
+            return
+
+        print(f"[PLAN] {action.upper()} {target} FOR {user_name} ON AWS ACCOUNT {context.account_identification}")
+
+        planned_operation_keys.add(operation_key)
+        planned_operations.append({
+            "account": context.account_number,
+            "account_identification": context.account_identification,
+            "user": user_name,
+            "access_method": access_method,
+            "target": target,
+            "action": action
+        })
+
+def save_remediation_plan_to(path: str, excluded_accounts: list = None) -> None:
+    """Saves the planned operations to the plan file, grouped by account and user in the order they were planned
+
+    :param path: Path of the plan file
+    :type path: str
+    :param excluded_accounts: Account numbers whose operations are left out, e.g. accounts whose sweep failed part way
+    :type excluded_accounts: list
+
+    :returns: None
+    """
+    excluded_accounts = set(excluded_accounts or [])
+    operations = [operation for operation in planned_operations if operation["account"] not in excluded_accounts]
+
+    remediation_plan = {
+        "version": script_version,
+        "created_at": datetime.datetime.now(utc_timezone).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+        "operations": sorted(operations, key=lambda operation: (operation["account"], operation["user"]))
+    }
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(remediation_plan, file, indent=4)
+    os.replace(temporary_path, path)
+
+    if len(operations) < len(planned_operations):
+        print(f"{script_name} left {len(planned_operations) - len(operations)} operation(s) planned on the failed AWS account(s) out of the plan")
+
+    print(f"{script_name} planned {len(operations)} operation(s), saved to {path}")
+
+def load_remediation_plan_from(path: str) -> list:
+    """Loads the operations from a plan file saved with --plan
+
+    :param path: Path of the plan file
+    :type path: str
+
+    :returns: List of the planned operations
+    :rtype: list
+    """
+    try:
+        with open(path, "r") as file:
+            operations = json.load(file)["operations"]
+    except (IOError, ValueError, KeyError, TypeError) as err:
+        print(f"""ATTENTION: \nUnable to load the remediation plan from {path}. \n\t- {str(err)}""")
+        exit(1)
+
+    expected_fields = {"account", "user", "access_method", "target", "action"}
+    for operation in operations:
+        if not isinstance(operation, dict) or not expected_fields.issubset(operation) or operation["action"] not in ("deactivate", "delete"):
+            print(f"""ATTENTION: \nThe remediation plan {path} contains an operation that cannot be applied: {operation}""")
+            exit(1)
+
+    return operations
+
+def apply_operation(context: AccountContext, operation: dict) -> bool:
+    """Carries out a single planned operation. Access keys and login profiles that no longer exist are
+    taken as already actioned, so a plan can be applied again after a partial failure
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param operation: The planned operation
+    :type operation: dict
+
+    :returns: Whether the operation was carried out (or had already been)
+    :rtype: bool
+    """
+    import botocore
+
+    user_name = operation["user"]
+    target = operation["target"]
+
+    try:
+        if target == "login-profile":
+            remove_password_access_for(context, user_name=user_name)
+        else:
+            carry_out_action_on_access_key(context, user_name, target, operation["action"])
+            record_action_taken_on(context, user_name, operation["access_method"], operation["action"], target)
+    except context.iam_client.exceptions.NoSuchEntityException:
+        print(f"{target} for user ({user_name}) no longer exists on AWS account {context.account_identification}, skipping")
+    except botocore.exceptions.ClientError as err:
+        print(f"""ATTENTION: \nUnable to {operation["action"]} {target} for user ({user_name}) on AWS account {context.account_identification}. \n\t- {str(err)}""")
+        return False
+
+    return True
+
+def apply_operations_for_user(context: AccountContext, operations: list) -> int:
+    """Carries out the planned operations for one user, one after the other in the order they were planned
+
+    :param context: Account context the user belongs to
+    :type context: AccountContext
+    :param operations: The user's planned operations
+    :type operations: list
+
+    :returns: Number of operations that failed
+    :rtype: int
+    """
+    return sum(1 for operation in operations if not apply_operation(context, operation))
+
+def apply_remediation_plan_on(context: AccountContext) -> None:
+    """Carries out the planned operations for the account without generating the credential report again.
+    Users are worked on at the same time by the remediation workers, each user's operations in order
+
+    :param context: Account context to apply the plan to
+    :type context: AccountContext
+
+    :returns: None
+    """
+    operations_by_user = collections.OrderedDict()
+
+    for operation in remediation_plan:
+        if operation["account"] == context.account_number:
+            operations_by_user.setdefault(operation["user"], []).append(operation)
+
+    number_of_operations = sum(len(operations) for operations in operations_by_user.values())
+
+    if not number_of_operations:
+        print(f"The remediation plan has no operations for AWS account {context.account_identification}")
+        return
+
+    # Create the shared rate limiter before any worker threads start
+    get_iam_mutation_rate_limiter(context)
+
+    with time_stage(context, "remediate"):
+        if remediation_workers <= 1:
+            number_of_failed_operations = sum(apply_operations_for_user(context, operations) for operations in operations_by_user.values())
+        else:
+            import concurrent.futures
+
+            apply_operations = with_output_of_this_thread(apply_operations_for_user)
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=remediation_workers) as executor:
+                futures = [executor.submit(apply_operations, context, operations) for operations in operations_by_user.values()]
+                number_of_failed_operations = sum(future.result() for future in futures)
+
+    save_actions_taken_for(context)
+
+    print(f"Applied {number_of_operations - number_of_failed_operations} of {number_of_operations} planned operation(s) on AWS account {context.account_identification}")
+
+    if number_of_failed_operations:
+        exit(1)
+
+def are_set_credentials_arguments_active(arguments: object, leading_context: AccountContext) -> AccountContext:
+    """Checks the arguments passed and sees if any AWS credential overrides are present
+
+    :param arguments: The arguments passed into script
+    :type: object
+    :param leading_context: Account context of the leading credential
+    :type leading_context: AccountContext
+
+    :returns: Account context to run against, with its alias or account number set
+    :rtype: AccountContext
+    """
+    context = leading_context
+
+    if arguments.use_aws_profile or arguments.use_credential_as_object:
+        credential_value = ""
+        if arguments.use_credential_as_object:
+            credential_value = arguments.use_credential_as_object
+        else:
+            credential_value = arguments.use_aws_profile
+        # Create boto client using argument
+        context = create_account_context_using(credential_value, is_role=False)
+
+    elif arguments.use_aws_role:
+        # Create boto client using argument
+        context = create_account_context_using(arguments.use_aws_role, is_role=True, leading_context=leading_context)
+
+    # Label metrics with the account number rather than the alias, looking it up before any other call is made
+    if metrics_collector is not None:
+        get_account_number_for(context)
+
+    # Get the alias and set it on the context
+    context.account_identification = get_current_account_id(context)
+
+    return context
+
+def initialise_leading_iam_client_check(arguments: object) -> AccountContext:
+    """Checks the environemt variables to see if on a Jenkins manchine and sees if 
+    expected arguments are passed if true. Otherwise creates leading IAM client with
+    default aws credentials from aws cli
+
+    :param arguments: The arguments passed into script
+    :type: object
+
+    :returns: Account context of the leading credential
+    :rtype: AccountContext
+    """
+    if os.getenv("JENKINS_URL") != None:
+        # Make sure Boto3 AWS_* environment variables aren't set
+        if ( os.getenv("AWS_ACCESS_KEY_ID") == None ) and ( os.getenv("AWS_SECRET_ACCESS_KEY") == None ):
+            # Make sure user has passed the name of the AWS profile to use on Jenkins
+            if arguments.jenkins_aws_profile_name:
+                return create_account_context_using(credential=arguments.jenkins_aws_profile_name)
+            else:
+                print(f"""ATTENTION:
+{script_name} has detected it is being used in a Jenkins system without you declaring which profile it should use by passing either one  of the `--jenkins-aws-profile-name`  OR `--japn` arguments. 
+
+Please pass the argument with a valid profile name and try again!
+""")
+                exit(1)
+        else:
+            # Create placeholder for boto IAM client using Jenkin's AWS_ environment variables
+            return create_account_context_using_default_system_credential()
+    else:
+        # create placeholder for boto IAM client  
+        return create_account_context_using_default_system_credential()
+
+def check_and_action_active(context: AccountContext, arguments: object) -> None:
+    """Checks the arguments passed to see which combination of functions need to be called and 
+    forward the variables passed to the said function(s).
+
+    :param context: Account context to run against
+    :type context: AccountContext
+    :param arguments: The arguments passed into script
+    :type: object
+
+    :returns: None
+    """
+    minimum_days = 2
+
+    # Plans are matched to accounts by number, as aliases are optional and lookups that fail all look the same
+    is_planning = remediation_plan_file and (arguments.deactivate_access_for_users_with_no_usage_within or arguments.delete_access_for_users_with_no_usage_within)
+    if (is_planning or remediation_plan is not None) and not get_account_number_for(context):
+        print(f"""ATTENTION: \nUnable to find the account number of AWS account {context.account_identification}, so changes cannot be planned or applied for it.""")
+        exit(1)
+
+    # Carry out a saved plan instead of checking the credential report
+    if remediation_plan is not None:
+        apply_remediation_plan_on(context)
+        return
+
+    if arguments.show_users_with_no_usage_within:
+        context.day_range = arguments.show_users_with_no_usage_within
+        get_all_users_not_used_in_the_last(context, number_of_days=arguments.show_users_with_no_usage_within, display=True)
+    
+    if arguments.list_users_with_no_usage_within:
+        context.day_range = arguments.list_users_with_no_usage_within
+        collections_of_users = get_all_users_not_used_in_the_last(context, number_of_days=arguments.list_users_with_no_usage_within)
+
+        # Keep what was found for the fleet report rather than printing it per account
+        if is_aggregate_mode_set:
+            context.findings = get_findings_from(context, collections_of_users)
+        else:
+            users_with_at_least_one_unused_access_method_from(context, collections_of_users=collections_of_users)
+
+    if arguments.deactivate_access_for_users_with_no_usage_within:
+        context.day_range = arguments.deactivate_access_for_users_with_no_usage_within
+        carry_out_action_on_users_in(context, users_collection=get_all_users_not_used_in_the_last(context, number_of_days=arguments.deactivate_access_for_users_with_no_usage_within), action='deactivate')
+    
+    if arguments.delete_access_for_users_with_no_usage_within:
+        context.day_range = arguments.delete_access_for_users_with_no_usage_within
+        carry_out_action_on_users_in(context, users_collection=get_all_users_not_used_in_the_last(context, number_of_days=arguments.delete_access_for_users_with_no_usage_within), action='delete')
+    
+    if arguments.list_users_to_be_kleaned:
+        all_users_not_using_any_access_methods_from(context, get_all_users_not_used_in_the_last(context, number_of_days=minimum_days, display=False), display=True)
+
+def get_findings_from(context: AccountContext, collections_of_users: dict) -> list:
+    """Gets a Finding for each access method in the collection not used within the days checked, with how long ago it was
+    last used. Access keys that have never been used are aged from when they were created
+
+    :param context: Account context the collection belongs to
+    :type context: AccountContext
+    :param collections_of_users: Collection of users dict
+    :type collections_of_users: dict
+
+    :returns: List of Finding
+    :rtype: list
+    """
+    collections_of_users = UserAccessCollection.from_dict(collections_of_users)
+    current_date_tzutc = datetime.datetime.now(utc_timezone)
+    findings = []
+
+    for user in collections_of_users.get_users_with_an_unused_access_method():
+        report_row = get_credential_report_row_for(context, user)
+
+        for access_method, value in collections_of_users[user].items():
+            if value is not True:
+                continue
+
+            if report_row is None:
+                last_used, age_from = "unknown", None
+            elif access_method == "password_access":
+                last_used, age_from = report_row.password_last_used, report_row.password_last_used
+            else:
+                access_key_number = access_method[len("access_key_")]
+                last_used = getattr(report_row, f"access_key_{access_key_number}_last_used_date")
+                age_from = getattr(report_row, f"access_key_{access_key_number}_last_rotated")
+
+                if last_used in credential_report_placeholders:
+                    last_used = "never"
+                else:
+                    age_from = last_used
+
+            age_in_days = None
+            if age_from and age_from not in credential_report_placeholders:
+                age_in_days = (current_date_tzutc - convert_this_to_date(string=age_from)).days
+
+            findings.append(Finding(context.account_number or context.account_identification, context.account_identification, user, access_method, last_used, age_in_days))
+
+    return findings
+
+def sort_findings(findings: list, sort_by: str) -> list:
+    """Sorts the findings, stalest first when sorting by age
+
+    :param findings: List of Finding
+    :type findings: list
+    :param sort_by: One of age, account, user or method
+    :type sort_by: str
+
+    :returns: Sorted list of Finding
+    :rtype: list
+    """
+    by_account_user_and_method = sorted(findings, key=lambda finding: (finding.account or "", finding.user, finding.access_method))
+
+    if sort_by == "age":
+        # Findings that could not be aged go last
+        return sorted(by_account_user_and_method, key=lambda finding: -1 if finding.age_in_days is None else finding.age_in_days, reverse=True)
+    if sort_by == "user":
+        return sorted(by_account_user_and_method, key=lambda finding: finding.user)
+    if sort_by == "method":
+        return sorted(by_account_user_and_method, key=lambda finding: finding.access_method)
+
+    return by_account_user_and_method
+
+def print_fleet_report_for(findings: list, number_of_accounts: int, day_range: int, sort_by: str = "age", top: int = 10) -> None:
+    """Prints a single table of the unused access methods found on every account swept, followed by the totals and the
+    stalest access keys, and sends the same summary to Slack as a single digest if requested
+
+    :param findings: List of Finding from every account
+    :type findings: list
+    :param number_of_accounts: Number of accounts swept
+    :type number_of_accounts: int
+    :param day_range: The number of days checked
+    :type day_range: int
+    :param sort_by: Column to sort the table by: age, account, user or method
+    :type sort_by: str
+    :param top: Number of the stalest access keys to show
+    :type top: int
+
+    :returns: None
+    """
+    findings = sort_findings(findings, sort_by)
+    findings_by_account = collections.Counter(finding.account for finding in findings)
+    account_identifications = {finding.account: finding.account_identification for finding in findings}
+    number_of_users = len(set((finding.account, finding.user) for finding in findings))
+    stalest_access_keys = [finding for finding in sort_findings(findings, "age") if finding.access_method != "password_access"][:top]
+
+    summary = f"{len(findings)} access method(s) on {number_of_users} user(s) across {len(findings_by_account)} of {number_of_accounts} AWS account(s) have not been used within {day_range} days"
+
+    def age_of(finding: object) -> str:
+        return "-" if finding.age_in_days is None else str(finding.age_in_days)
+
+    # Size each column to fit its widest value
+    headings = ("ACCOUNT", "USER", "METHOD", "LAST USED", "AGE (DAYS)")
+    rows = [(str(finding.account), finding.user, finding.access_method, finding.last_used, age_of(finding)) for finding in findings]
+    widths = [max([len(heading)] + [len(row[column]) for row in rows]) for column, heading in enumerate(headings)]
+
+    print(f">>> FLEET REPORT (no usage within {day_range} days, sorted by {sort_by})")
+    print("  ".join(heading.ljust(width) for heading, width in zip(headings, widths)).rstrip())
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+    print("")
+    print(summary)
+    for account, number_of_findings in sorted(findings_by_account.items(), key=lambda item: (-item[1], str(item[0]))):
+        print(f"• {account} ({account_identifications[account] or 'N/A'}): {number_of_findings}")
+    for access_method in access_method_names:
+        print(f"• {access_method}: {sum(1 for finding in findings if finding.access_method == access_method)}")
+
+    if stalest_access_keys:
+        print(f"The {len(stalest_access_keys)} stalest access key(s)")
+        for finding in stalest_access_keys:
+            print(f"• {finding.account} {finding.user} {finding.access_method} ({age_of(finding)} days, last used {finding.last_used})")
+
+    print("")
+
+    # One digest for the whole fleet rather than a message per account
+    if is_notify_slack_mode_set and findings:
+        stalest_access_keys_message = " ".join(f"• {finding.account}/{finding.user} {finding.access_method} ({age_of(finding)} days)" for finding in stalest_access_keys)
+        accounts_message = " ".join(f"• {account}: {number_of_findings}" for account, number_of_findings in sorted(findings_by_account.items(), key=lambda item: (-item[1], str(item[0]))))
+        send_to_slack_this(message=f"{summary}. By account: {accounts_message}. Stalest access key(s): {stalest_access_keys_message}")
+
+def get_accounts_to_sweep_from(arguments: object) -> list:
+    """Builds the list of AWS account numbers passed using either --accounts or --accounts-file
+
+    :param arguments: The arguments passed into script
+    :type: object
+
+    :returns: List of unique AWS account numbers, in the order they were passed
+    :rtype: list
+    """
+    accounts_to_sweep = []
+
+    if arguments.accounts:
+        accounts_to_sweep = arguments.accounts.split(",")
+    elif arguments.accounts_file:
+        try:
+            with open(arguments.accounts_file, "r") as file:
+                # One account per line, ignore blank lines and comments
+                for line in file:
+                    line = line.split("#")[0]
+                    accounts_to_sweep.extend(line.split(","))
+        except IOError:
+            print(f"""ATTENTION: \nUnable to read the accounts file "{arguments.accounts_file}". Please make sure it exists and try again!""")
+            exit(1)
+
+    # Remove whitespace, blanks and duplicates while keeping order
+    accounts_to_sweep = [account.strip() for account in accounts_to_sweep if account.strip()]
+
+    return list(collections.OrderedDict.fromkeys(accounts_to_sweep))
+
+def sweep_account_using(account_number: str, arguments: object, leading_context: AccountContext) -> dict:
+    """Runs the requested actions against a single AWS account using its own assumed role session and IAM client.
+    Intended to be run on a sweep worker thread, with stdout routed per thread.
+
+    :param account_number: The AWS account number to run against
+    :type account_number: str
+    :param arguments: The arguments passed into script
+    :type: object
+    :param leading_context: Account context of the leading credential, used to assume the role
+    :type leading_context: AccountContext
+
+    :returns: Dict containing the account number, its identification, whether the run succeeded, the terminal output and the fleet report findings
+    :rtype: dict
+    """
+    context = None
+    account_output = io.StringIO()
+    is_successful = True
+
+    with sys.stdout.redirect_to(account_output):
+        try:
+            # Assume the role from the leading credential each time so roles are not chained
+            context = create_account_context_using(f"{account_number},{arguments.role_name}", is_role=True, leading_context=leading_context)
+            context.account_number = account_number
+            context.account_identification = get_current_account_id(context)
+            check_and_action_active(context, arguments)
+        except SystemExit:
+            is_successful = False
+        except Exception as err:
+            print(f"ATTENTION: \nUnexpected error whilst sweeping AWS account {account_number}. \n\t- {str(err)}")
+            is_successful = False
+
+    return {
+        "account": account_number,
+        "account_identification": context.account_identification if context else None,
+        "successful": is_successful,
+        "output": account_output.getvalue(),
+        "findings": context.findings if context else []
+    }
+
+def get_failed_sweep_result_for(account_number: str, err: Exception) -> dict:
+    """Builds the result for an account whose sweep worker failed before it could return one
+
+    :param account_number: The AWS account number that was being swept
+    :type account_number: str
+    :param err: The error raised by the sweep worker
+    :type err: Exception
+
+    :returns: Dict in the same form sweep_account_using returns
+    :rtype: dict
+    """
+    return {
+        "account": account_number,
+        "account_identification": None,
+        "successful": False,
+        "output": f"ATTENTION: \nSweep worker failed for AWS account {account_number}. \n\t- {str(err)}\n",
+        "findings": []
+    }
+
+async def sweep_accounts_asynchronously_with(accounts_to_sweep: list, arguments: object, leading_context: AccountContext) -> dict:
+    """Sweeps every account as concurrent asyncio tasks, bounded by a semaphore the size of --concurrency.
+    Each account's blocking boto3 calls, including generating its credential report, are offloaded to a thread pool
+    the same size as the semaphore
+
+    :param accounts_to_sweep: List of AWS account numbers to sweep
+    :type accounts_to_sweep: list
+    :param arguments: The arguments passed into script
+    :type: object
+    :param leading_context: Account context of the leading credential, used to assume the roles
+    :type leading_context: AccountContext
+
+    :returns: Dict of each account number and the result of its sweep
+    :rtype: dict
+    """
+    import asyncio
+    import concurrent.futures
+
+    number_of_workers = min(arguments.concurrency, len(accounts_to_sweep))
+    semaphore = asyncio.Semaphore(number_of_workers)
+    loop = asyncio.get_event_loop()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=number_of_workers) as executor:
+        async def sweep_account_asynchronously(account: str) -> dict:
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(executor, sweep_account_using, account, arguments, leading_context)
+                except Exception as err:
+                    return get_failed_sweep_result_for(account, err)
+
+        sweep_results = await asyncio.gather(*(sweep_account_asynchronously(account) for account in accounts_to_sweep))
+
+    return dict(zip(accounts_to_sweep, sweep_results))
+
+def sweep_accounts_with(arguments: object, leading_context: AccountContext = None) -> None:
+    """Fans the requested actions out across multiple AWS accounts using a bounded pool of worker threads, each
+    account with its own context, then prints a single merged report, ordered as the accounts were passed.
+
+    :param arguments: The arguments passed into script
+    :type: object
+    :param leading_context: Account context of the leading credential, created from the arguments if not passed
+    :type leading_context: AccountContext
+
+    :returns: None
+    """
+    if not arguments.role_name:
+        print(f"""ATTENTION: \nPlease pass the name of the IAM role to assume on each account using --role-name when using --accounts or --accounts-file.""")
+        exit(1)
+
+    if arguments.concurrency < 1:
+        print(f"""ATTENTION: \n--concurrency must be at least 1.""")
+        exit(1)
+
+    accounts_to_sweep = get_accounts_to_sweep_from(arguments)
+
+    if not accounts_to_sweep:
+        print(f"""ATTENTION: \nNo AWS account numbers were found to sweep.""")
+        exit(1)
+
+    # Load the super users and create the leading STS client once, before the worker threads share them
+    get_super_user_matcher()
+    if leading_context is None:
+        leading_context = initialise_leading_iam_client_check(arguments)
+    leading_context.get_sts_client()
+
+    # Label the roles assumed by the leading credential with its own account number
+    if metrics_collector is not None:
+        get_account_number_for(leading_context)
+
+    sweep_start_time = time.time()
+    sweep_results = {}
+
+    import concurrent.futures
+
+    # Keep what each account prints apart while the accounts are worked on at the same time
+    terminal = sys.stdout
+    sys.stdout = ThreadOutputRouter(terminal)
+
+    try:
+        if is_asyncio_mode_set:
+            sweep_results = run_asynchronously(sweep_accounts_asynchronously_with(accounts_to_sweep, arguments, leading_context))
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(arguments.concurrency, len(accounts_to_sweep))) as executor:
+                future_to_account = {executor.submit(sweep_account_using, account, arguments, leading_context): account for account in accounts_to_sweep}
+
+                for future in concurrent.futures.as_completed(future_to_account):
+                    account = future_to_account[future]
+                    try:
+                        sweep_results[account] = future.result()
+                    except Exception as err:
+                        sweep_results[account] = get_failed_sweep_result_for(account, err)
+    finally:
+        sys.stdout = terminal
+
+    # Merge the per-account results into one report
+    failed_accounts = []
+    is_remediating = arguments.deactivate_access_for_users_with_no_usage_within or arguments.delete_access_for_users_with_no_usage_within
+    for account in accounts_to_sweep:
+        result = sweep_results[account]
+
+        if not result["successful"]:
+            failed_accounts.append(account)
+
+        # The fleet report stands in for each account's own output, unless something went wrong or was changed
+        if is_aggregate_mode_set and result["successful"] and not is_remediating:
+            continue
+
+        print(f">>> AWS ACCOUNT {account} ({result['account_identification'] or 'N/A'})")
+        print(result["output"].rstrip("\n"))
+        print("")
+
+    if is_aggregate_mode_set:
+        print_fleet_report_for(
+            [finding for account in accounts_to_sweep for finding in sweep_results[account]["findings"]],
+            number_of_accounts=len(accounts_to_sweep),
+            day_range=arguments.list_users_with_no_usage_within,
+            sort_by=aggregate_sort_by,
+            top=aggregate_top
+        )
+
+    print(f"{script_name} swept {len(accounts_to_sweep)} AWS account(s) in {time.time() - sweep_start_time:.1f} seconds: {len(accounts_to_sweep) - len(failed_accounts)} succeeded, {len(failed_accounts)} failed")
+
+    # Save what was planned on the accounts that succeeded, a failed account's operations may be incomplete
+    if remediation_plan_file:
+        save_remediation_plan_to(remediation_plan_file, excluded_accounts=failed_accounts)
+
+    if failed_accounts:
+        print(f"Failed AWS account(s): • {' • '.join(failed_accounts)}")
+        exit(1)
+
+class AWSKleanRequestHandler:
+    """Handles requests made to the tool while it is running with --serve. GET /health reports the server is up,
+    and POST /<operation> (show, list, deactivate, delete or list-to-be-kleaned) runs the operation, taking a JSON
+    body with the number of days and, optionally, dry_run, notify_slack, a credential override, accounts and role_name.
+    Combined with http.server.BaseHTTPRequestHandler by create_server_for, so http.server is only loaded when serving
+    """
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        self.send_json(200, {"status": "ok", "version": script_version})
+
+    def do_POST(self):
+        operation = self.path.strip("/")
+
+        if operation not in server_operations:
+            self.send_json(404, {"error": f"Unknown operation {operation}, use one of: {', '.join(server_operations)}"})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            arguments = build_server_arguments_for(operation, request, self.server.arguments)
+        except (ValueError, TypeError, AttributeError) as err:
+            self.send_json(400, {"error": str(err)})
+            return
+
+        self.send_json(200, run_server_request(operation, arguments, self.server.leading_context))
+
+    def send_json(self, status: int, body: dict) -> None:
+        """Sends the body as the JSON response
+
+        :param status: HTTP status code
+        :type status: int
+        :param body: Response body
+        :type body: dict
+
+        :returns: None
+        """
+        content = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # Requests are logged once they finish by run_server_request
+        pass
+
+def is_unix_socket_address(server_address: str) -> bool:
+    """Checks whether the server address is the path of a Unix socket rather than a host and port
+
+    :param server_address: Path of a Unix socket, or host:port
+    :type server_address: str
+
+    :returns: Whether the address is a Unix socket path
+    :rtype: bool
+    """
+    return "/" in server_address or not server_address.rsplit(":", 1)[-1].isdigit()
+
+def get_server_connection_for(server_address: str) -> object:
+    """Creates a connection to the tool's server, connecting straight away when using a Unix socket
+
+    :param server_address: Path of a Unix socket, or host:port
+    :type server_address: str
+
+    :returns: HTTP connection to the server
+    :rtype: object
+    """
+    import http.client
+    import socket
+
+    if not is_unix_socket_address(server_address):
+        host, port = server_address.rsplit(":", 1)
+
+        return http.client.HTTPConnection(host, int(port), timeout=server_request_timeout)
+
+    # http.client only connects over TCP, so hand it an already connected Unix socket
+    unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    unix_socket.settimeout(server_request_timeout)
+
+    try:
+        unix_socket.connect(server_address)
+    except OSError:
+        unix_socket.close()
+        raise
+
+    connection = http.client.HTTPConnection("localhost", timeout=server_request_timeout)
+    connection.sock = unix_socket
 
-def remove_password_access_for(user_name: str):
-    """Deletes the console access to AWS account for passed IAM username
+    return connection
 
-    :param user_name: IAM username
-    :user_name: str
+def create_server_for(server_address: str) -> object:
+    """Creates the server listening on the address. Unix sockets are only accessible by the current user
 
-    :returns: None
+    :param server_address: Path of a Unix socket, or host:port
+    :type server_address: str
+
+    :returns: The server
+    :rtype: object
     """
-    global account_identification
+    # Imported here so only --serve pays for loading http.server
+    import http.server
+    import ipaddress
+    import socketserver
 
-    # Generate simple message
-    simple_message=f"DELETED CONSOLE ACCESS FOR {user_name} ON AWS ACCOUNT {account_identification}"
-    
-    # Check if dry run mode set and whether slack needs to be notified
-    if is_dry_run_mode_set:
-        dry_run_setup(message=simple_message)
-        if is_notify_slack_mode_set:
-            send_to_slack_this(message=dry_run_setup(message=simple_message, forward=True))
-    else:
-        # Check if notify slack set and act accordingly
-        if is_notify_slack_mode_set:
-            send_to_slack_this(message=f"{user_name}'s Console Access has been revoked on AWS account ({account_identification}).")
-        
-        # Print to terminal
-        live_mode_print(message=simple_message)
+    request_handler = type("RequestHandler", (AWSKleanRequestHandler, http.server.BaseHTTPRequestHandler), {})
 
-        iam_client.delete_login_profile(
-            UserName=user_name,
-        )
+    if not is_unix_socket_address(server_address):
+        host, port = server_address.rsplit(":", 1)
 
-def alter_access_key_for(user_name: str, access_key_number: int, action: str):
-    """Modifys the access key(s) for passed IAM user. It can remove or deactivate dependant on action passed.
+        # Requests are not authenticated, so only listen where nothing but this machine can reach the server
+        try:
+            is_loopback_host = host == "localhost" or ipaddress.ip_address(host.strip("[]")).is_loopback
+        except ValueError:
+            is_loopback_host = False
 
-    :param user_name: IAM username
-    :type user_name: str
-    :param access_key_number: Use to specify the access key on the user's account which should be modified
-    :type access_key_number: int
-    :param action: Specify whether function should "delete" or "deactivate" the access key
-    :type action: str
+        if not is_loopback_host:
+            print(f"""ATTENTION: \n{script_name} only serves requests on a loopback address (e.g. 127.0.0.1:8765) or a Unix socket, as requests are not authenticated.""")
+            exit(1)
+        local_http_server = type("LocalHTTPServer", (socketserver.ThreadingMixIn, http.server.HTTPServer), {"daemon_threads": True})
 
-    :returns: None
+        return local_http_server((host, int(port)), request_handler)
+
+    unix_socket_http_server = type("UnixSocketHTTPServer", (socketserver.ThreadingMixIn, socketserver.UnixStreamServer), {"daemon_threads": True})
+
+    if os.path.exists(server_address):
+        # Only remove the socket if it was left behind by a server that is no longer running
+        try:
+            get_server_connection_for(server_address).close()
+        except OSError:
+            os.remove(server_address)
+        else:
+            print(f"""ATTENTION: \n{script_name} is already serving requests on {server_address}.""")
+            exit(1)
+
+    # Create the socket without permissions for anybody but the current user
+    previous_umask = os.umask(0o177)
+
+    try:
+        return unix_socket_http_server(server_address, request_handler)
+    finally:
+        os.umask(previous_umask)
+
+def build_server_arguments_for(operation: str, request: dict, server_arguments: object) -> object:
+    """Builds the arguments for a request from the arguments the server was started with and the request body
+
+    :param operation: The requested operation
+    :type operation: str
+    :param request: The request body
+    :type request: dict
+    :param server_arguments: The arguments the server was started with
+    :type server_arguments: object
+
+    :returns: The arguments to run the request with
+    :rtype: object
     """
-    global account_identification
-    global is_dry_run_mode_set
-    global is_notify_slack_mode_set
-    global iam_client
+    arguments = argparse.Namespace(**vars(server_arguments))
 
-    # Nested function to get access key ID for passed user
-    def get_additional_access_key_information_for(user_name: str = user_name):
-        access_key_infomation_paginator = iam_client.get_paginator('list_access_keys')
-        for information in access_key_infomation_paginator.paginate(UserName=user_name):
-            return information
-    
-    # Nested function to deactivate access key ID for passed user
-    def for_this_users_access_key_do(user: str, access_key: str, action: str):
-        """Acts the passed action to the named access key for the stated user"""
-        if action == "deactivate":
-            # Generate simple message
-            simple_message=f"DEACTIVATED KEY {access_key} FOR {user} ON AWS ACCOUNT {account_identification}"
-            
-            # Check if dry run mode set and whether slack needs to be notified
-            if is_dry_run_mode_set:
-                dry_run_setup(message=simple_message)
-                if is_notify_slack_mode_set:
-                    send_to_slack_this(message=dry_run_setup(message=simple_message, forward=True))
-            else:
-                # Check if notify slack set and act accordingly
-                if is_notify_slack_mode_set:
-                    send_to_slack_this(message=f"{user}'s Access Key ({access_key}) has been deactivated on AWS account ({account_identification}).")
-
-                # Print to terminal
-                live_mode_print(message=simple_message)
-
-                # Deactivate access key
-                iam_client.update_access_key(
-                    AccessKeyId=access_key,
-                    Status='Inactive',
-                    UserName=user
-                )
+    for option in server_operations.values():
+        setattr(arguments, option, None)
 
-        elif action == "delete":
-             # Generate simple message
-            simple_message=f"DELETED KEY {access_key} FOR {user} ON AWS ACCOUNT {account_identification}"
-
-            # Check if dry run mode set and whether slack needs to be notified
-            if is_dry_run_mode_set:
-                dry_run_setup(message=simple_message)
-                if is_notify_slack_mode_set:
-                    send_to_slack_this(message=dry_run_setup(message=simple_message, forward=True))
-            else:
-                # Check if notify slack set and act accordingly
-                if is_notify_slack_mode_set:
-                    send_to_slack_this(message=f"{user}'s Access Key ({access_key}) has been deleted on AWS account ({account_identification}).")
+    if operation == "list-to-be-kleaned":
+        arguments.list_users_to_be_kleaned = True
+    else:
+        days = request.get("days")
 
-                # Print to terminal
-                live_mode_print(message=simple_message)
+        if not isinstance(days, int) or isinstance(days, bool) or days < 1:
+            raise ValueError(f"The {operation} operation needs a whole number of days of at least 1")
 
-                # Delete access key
-                iam_client.delete_access_key(
-                    AccessKeyId=access_key,
-                    UserName=user
-                )
-    
-    # Assign additional information into variable
-    user_access_key_information = get_additional_access_key_information_for()
+        setattr(arguments, server_operations[operation], days)
 
-    # Check to make sure Access Key information exists
-    if not user_access_key_information['AccessKeyMetadata']:
-        print(f"No access key information can be found for user {user_name} on AWS account {account_identification}" )
-        return ""
-    
-    # Verb creator
-    verb = "deactiving" if (action == "deactivate") else "deleting"
+    # A request can turn dry run or Slack on, but never off if the server was started with them
+    arguments.dry_run = server_arguments.dry_run or bool(request.get("dry_run", False))
+    arguments.notify_slack = server_arguments.notify_slack or bool(request.get("notify_slack", False))
 
-    # Check which access key
-    if access_key_number == 1:
-        # Get 1st access key
-        access_key_1 = user_access_key_information['AccessKeyMetadata'][0]['AccessKeyId']
-        print(f"{verb} access_key_1 {access_key_1} for user ({user_name}) on AWS account {account_identification}")
-        for_this_users_access_key_do(user=user_name, access_key=access_key_1, action=action)
-    elif access_key_number == 2:
-        # Get 2nd access key
-        access_key_2 = user_access_key_information['AccessKeyMetadata'][1]['AccessKeyId']
-        print(f"{verb} access_key_2 {access_key_2} for user ({user_name}) on AWS account {account_identification}")
-        for_this_users_access_key_do(user=user_name, access_key=access_key_2, action=action)
- 
-
-def carry_out_action_on_users_in(users_collection: dict, action = ""):
-    """Runs passed action against any user's methods of access in the users collection that is 'True'
+    # A credential passed with the request replaces the one the server was started with
+    credential_options = ["use_credential_as_object", "use_aws_profile", "use_aws_role", "accounts"]
+    if any(request.get(option) for option in credential_options):
+        for option in credential_options:
+            setattr(arguments, option, request.get(option))
 
-    :param users_collection: Dict of users, each its own dict containing information about user's methods of access status
-    :type users_collection: dict
-    :param action: Action that should be carried out
-    :type action: str
+    arguments.accounts_file = None
+    arguments.role_name = request.get("role_name", server_arguments.role_name)
 
-    :returns: None
-    """
-    # Loop through user collection and see what should be actioned
-    for user in users_collection.keys():
-        for access_method, value in users_collection[user].items():
-            # Make sure the value is only True, and not 'null' as non-empty strings are seen as a truthy
-            if value and value != 'null':
-                if access_method == 'access_key_1_access':
-                    # Check which action is passed
-                    if action == 'delete':
-                        alter_access_key_for( user_name = user, access_key_number=1, action=action )
-                    if action == 'deactivate':
-                        alter_access_key_for( user_name = user, access_key_number=1, action=action )
-                elif access_method == 'access_key_2_access':
-                    # Check which action is passed
-                    if action == 'delete':
-                        alter_access_key_for( user_name = user, access_key_number=2, action=action )
-                    if action == 'deactivate':
-                        alter_access_key_for( user_name = user, access_key_number=2, action=action )
-                elif access_method == 'password_access':
-                    # AWS IAM passwords can only be deleted
-                    remove_password_access_for(user_name = user)
-                
-def are_set_credentials_arguments_active(arguments: object) -> None:
-    """Checks the arguments passed and sees if any AWS credential overrides are present
+    return arguments
 
-    :param arguments: The arguments passed into script
-    :type: object
+def run_server_request(operation: str, arguments: object, leading_context: AccountContext) -> dict:
+    """Runs a request made to the server, one request at a time, capturing what it prints
 
-    :returns: None
+    :param operation: The requested operation
+    :type operation: str
+    :param arguments: The arguments to run the request with
+    :type arguments: object
+    :param leading_context: Account context of the leading credential, kept for the life of the server
+    :type leading_context: AccountContext
+
+    :returns: Dict containing the operation, whether it succeeded and its terminal output
+    :rtype: dict
     """
-    global account_identification
+    global super_user_matcher
+    request_output = io.StringIO()
+    is_successful = True
 
-    if arguments.use_aws_profile or arguments.use_credential_as_object:
-        credential_value = ""
-        if arguments.use_credential_as_object:
-            credential_value = arguments.use_credential_as_object
-        else:
-            credential_value = arguments.use_aws_profile
-        # Create boto client using argument
-        create_boto_client_using(credential_value, is_role=False)
+    with server_request_lock:
+        request_start_time = time.time()
 
-    elif arguments.use_aws_role:
-        # Create boto client using argument
-        create_boto_client_using(arguments.use_aws_role, is_role=True)
+        with sys.stdout.redirect_to(request_output):
+            is_dry_run_active(arguments.dry_run)
+            is_notify_slack_active(arguments.notify_slack)
 
-    # Get the alias and set to global variable
-    account_identification = get_current_account_id()
+            # Pick up changes to the super users file within its TTL
+            super_user_matcher = None
 
-def initialise_leading_iam_client_check(arguments: object) -> None:
-    """Checks the environemt variables to see if on a Jenkins manchine and sees if 
-    expected arguments are passed if true. Otherwise creates leading IAM client with
-    default aws credentials from aws cli
+            try:
+                if arguments.accounts:
+                    sweep_accounts_with(arguments, leading_context)
+                else:
+                    context = are_set_credentials_arguments_active(arguments, leading_context.with_same_clients())
+                    check_and_action_active(context, arguments)
+            except SystemExit as err:
+                is_successful = err.code in (None, 0)
+            except Exception as err:
+                print(f"ATTENTION: \nUnexpected error whilst running {operation}. \n\t- {str(err)}")
+                is_successful = False
+            finally:
+                flush_slack_notifications()
+
+        print(f"{operation} {'succeeded' if is_successful else 'failed'} in {time.time() - request_start_time:.1f} seconds")
+
+    return {
+        "operation": operation,
+        "successful": is_successful,
+        "output": request_output.getvalue()
+    }
+
+def serve_requests_with(arguments: object) -> None:
+    """Runs the tool as a long-running server, keeping the leading session, assumed role sessions and (with
+    --report-cache-ttl) parsed credential reports warm between requests
 
     :param arguments: The arguments passed into script
     :type: object
 
     :returns: None
     """
-    global iam_client
+    global warm_credential_reports
 
-    if os.getenv("JENKINS_URL") != None:
-        # Make sure Boto3 AWS_* environment variables aren't set
-        if ( os.getenv("AWS_ACCESS_KEY_ID") == None ) and ( os.getenv("AWS_SECRET_ACCESS_KEY") == None ):
-            # Make sure user has passed the name of the AWS profile to use on Jenkins
-            if args.jenkins_aws_profile_name:
-                create_boto_client_using(credential=args.jenkins_aws_profile_name)
-            else:
-                print(f"""ATTENTION:
-{script_name} has detected it is being used in a Jenkins system without you declaring which profile it should use by passing either one  of the `--jenkins-aws-profile-name`  OR `--japn` arguments. 
+    leading_context = initialise_leading_iam_client_check(arguments)
+    leading_context.get_sts_client()
+    warm_credential_reports = {}
 
-Please pass the argument with a valid profile name and try again!
-""")
-                exit(1)
-        else:
-            # Create placeholder for boto IAM client using Jenkin's AWS_ environment variables
-            create_iam_client_using_default_system_credential()
-    else:
-        # create placeholder for boto IAM client  
-        create_iam_client_using_default_system_credential()
+    server = create_server_for(arguments.server_address)
+    server.arguments = arguments
+    server.leading_context = leading_context
 
-def check_and_action_active(arguments: object) -> None:
-    """Checks the arguments passed to see which combination of functions need to be called and 
-    forward the variables passed to the said function(s).
+    # Keep what each request prints apart from the server's own output
+    sys.stdout = ThreadOutputRouter(sys.stdout)
+
+    print(f"{script_name} is serving requests on {arguments.server_address}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+        if is_unix_socket_address(arguments.server_address) and os.path.exists(arguments.server_address):
+            os.remove(arguments.server_address)
+
+def send_to_server(server_address: str, operation: str, request: dict) -> dict:
+    """Sends the operation to the tool's server and waits for it to finish
+
+    :param server_address: Path of a Unix socket, or host:port
+    :type server_address: str
+    :param operation: The operation to run
+    :type operation: str
+    :param request: The request body
+    :type request: dict
+
+    :returns: The server's response
+    :rtype: dict
+    """
+    connection = get_server_connection_for(server_address)
+
+    try:
+        connection.request("POST", f"/{operation}", body=json.dumps(request), headers={"Content-Type": "application/json"})
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+def run_via_server(arguments: object) -> None:
+    """Sends each requested operation to the tool's server, in the order they are run locally, printing their output
 
     :param arguments: The arguments passed into script
     :type: object
 
     :returns: None
     """
-    global day_range
-    minimum_days = 2
+    import http.client
 
-    if arguments.show_users_with_no_usage_within:
-        day_range = arguments.show_users_with_no_usage_within
-        get_all_users_not_used_in_the_last(number_of_days=arguments.show_users_with_no_usage_within, display=True)
-    
-    if arguments.list_users_with_no_usage_within:
-        day_range = arguments.list_users_with_no_usage_within
-        users_with_at_least_one_unused_access_method_from(collections_of_users=get_all_users_not_used_in_the_last(number_of_days=arguments.list_users_with_no_usage_within))
+    request = {
+        "dry_run": arguments.dry_run,
+        "notify_slack": arguments.notify_slack,
+        "use_credential_as_object": arguments.use_credential_as_object,
+        "use_aws_profile": arguments.use_aws_profile,
+        "use_aws_role": arguments.use_aws_role,
+        "accounts": ",".join(get_accounts_to_sweep_from(arguments)) or None
+    }
 
-    if arguments.deactivate_access_for_users_with_no_usage_within:
-        day_range = arguments.deactivate_access_for_users_with_no_usage_within
-        carry_out_action_on_users_in(users_collection=get_all_users_not_used_in_the_last(number_of_days=arguments.deactivate_access_for_users_with_no_usage_within), action='deactivate')
-    
-    if arguments.delete_access_for_users_with_no_usage_within:
-        day_range = arguments.delete_access_for_users_with_no_usage_within
-        carry_out_action_on_users_in(users_collection=get_all_users_not_used_in_the_last(number_of_days=arguments.delete_access_for_users_with_no_usage_within), action='delete')
-    
-    if arguments.list_users_to_be_kleaned:
-        all_users_not_using_any_access_methods_from( get_all_users_not_used_in_the_last(number_of_days=minimum_days, display=False), display=True)
+    if arguments.role_name:
+        request["role_name"] = arguments.role_name
+
+    requested_operations = [(operation, getattr(arguments, option)) for operation, option in server_operations.items() if getattr(arguments, option)]
+
+    if not requested_operations:
+        print(f"""ATTENTION: \nPlease pass at least one of -s, -l, -d, -D or -L to run using --via-server.""")
+        exit(1)
+
+    is_successful = True
+
+    for operation, days in requested_operations:
+        operation_request = dict(request)
+        if operation != "list-to-be-kleaned":
+            operation_request["days"] = days
+
+        try:
+            response = send_to_server(arguments.server_address, operation, operation_request)
+        except (OSError, http.client.HTTPException, ValueError) as err:
+            print(f"""ATTENTION: \nUnable to reach {script_name} serving on {arguments.server_address}, please make sure it is running with --serve. \n\t- {str(err)}""")
+            exit(1)
+
+        if "error" in response:
+            print(f"""ATTENTION: \n{response["error"]}""")
+            is_successful = False
+            continue
+
+        if response["output"]:
+            print(response["output"].rstrip("\n"))
+
+        if not response["successful"]:
+            is_successful = False
+
+    if not is_successful:
+        exit(1)
 
 if __name__ == "__main__":
     argument_parser = argparse.ArgumentParser(
@@ -939,13 +3960,34 @@ if __name__ == "__main__":
         action="store_true"
     )
 
+    argument_parser.add_argument(
+        "--slack-batch-size",
+        "--sbs",
+        help="Use to specify the most notifications sent to slack in one message (default: 20)",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--slack-batch-seconds",
+        "--sbsec",
+        help="Use to specify the most seconds a notification waits before being sent to slack (default: 5)",
+        type=float
+    )
+
     argument_parser.add_argument(
         "--super-users-url",
         "--suu",
-        help=f"Use to specify the URL for remote JSON file containing super users in specified {script_name} format. \nNOTE: This will delete an local copy before attempting to download!",
+        help=f"Use to specify the URL for remote JSON file containing super users in specified {script_name} format. \nNOTE: This will replace any local copy once downloaded!",
         type=str
     )
 
+    argument_parser.add_argument(
+        "--super-users-ttl",
+        "--sut",
+        help="Use to specify the number of minutes a downloaded super users file is used for before checking the URL for changes (default: 60)",
+        type=int
+    )
+
     argument_parser.add_argument(
         "--jenkins-aws-profile-name",
         "--japn",
@@ -985,6 +4027,33 @@ if __name__ == "__main__":
         type=int
     )
 
+    argument_parser.add_argument(
+        "--remediation-workers",
+        "--rw",
+        help="Use to specify how many users -d/-D should work on at the same time, each user's access methods are still actioned in order (default: 1)",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--asyncio",
+        help="Use to run -d/-D deactivations/ deletions, and each account passed using --accounts or --accounts-file, as concurrent asyncio tasks instead of a thread per user/ account",
+        action="store_true"
+    )
+
+    argument_parser.add_argument(
+        "--asyncio-concurrency",
+        "--ac",
+        help="Use to specify the most in-flight IAM calls when using --asyncio (default: 20)",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--iam-mutations-per-second",
+        "--imps",
+        help="Use to specify the most IAM changes (deactivations/ deletions) made per second, throttled calls are retried with backoff (default: 5)",
+        type=float
+    )
+
     argument_parser.add_argument(
         "--aws-region",
         "--ar",
@@ -992,6 +4061,96 @@ if __name__ == "__main__":
         type=str
     )
 
+    argument_parser.add_argument(
+        "--credential-report-timeout",
+        "--crt",
+        help="Use to specify the number of seconds to wait for AWS to generate the credential report before giving up (default: 300)",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--max-report-age",
+        "--mra",
+        help="Use to reuse the existing credential report, instead of generating a new one, if it was generated within the specified number of minutes (AWS keeps a report for 4 hours)",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--report-cache-ttl",
+        "--rct",
+        help="Use to keep a local copy of each account's credential report and reuse it, without calling AWS, for the specified number of minutes",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--report-cache-dir",
+        "--rcd",
+        help=f"Use to specify the directory the local credential report cache is kept in (default: {script_location}/.awsklean_cache)",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--report-cache-max-size",
+        "--rcms",
+        help="Use to specify the size in MB the local credential report cache can grow to before the oldest reports are removed (default: 50)",
+        type=int
+    )
+
+    argument_parser.add_argument(
+        "--cache-role-credentials",
+        "--crc",
+        help="Use to keep assumed role credentials in the report cache directory and reuse them until shortly before they expire",
+        action="store_true"
+    )
+
+    argument_parser.add_argument(
+        "--state-file",
+        "--sf",
+        help="Use to keep each user's credential report row and the actions taken on them in the passed SQLite file, so later runs report which users changed and skip access methods already actioned",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--output",
+        "-o",
+        help="Use to write a machine readable record per user found by -s, -l and -L to stdout as they are found, instead of the usual output, which moves to stderr",
+        choices=output_formats
+    )
+
+    argument_parser.add_argument(
+        "--metrics-json",
+        "--mj",
+        help="Use to save a summary of the AWS API calls made (counted and timed by account, service and operation) and the time spent in each stage of the run to the passed JSON file",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--prometheus-textfile",
+        "--pt",
+        help="Use to save the same metrics in the Prometheus text format to the passed file, e.g. for the node exporter's textfile collector",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--statsd",
+        help="Use to send each API call and stage timing to the StatsD server at the passed host:port as it happens",
+        type=str
+    )
+
+    plan_argument_group = argument_parser.add_mutually_exclusive_group()
+
+    plan_argument_group.add_argument(
+        "--plan",
+        help="Use with -d and/or -D to save the operations that would be carried out to the passed JSON file, instead of carrying them out",
+        type=str
+    )
+
+    plan_argument_group.add_argument(
+        "--apply",
+        help="Use to carry out the operations saved to the passed JSON file with --plan, without generating the credential report again. Pass the same credential arguments used to plan",
+        type=str
+    )
+
     argument_parser.add_argument(
         "-L",
         "--list-users-to-be-kleaned",
@@ -1021,6 +4180,74 @@ if __name__ == "__main__":
         type=str
     )
 
+    argument_group.add_argument(
+        "--accounts",
+        help="Use this to pass in a comma-separated string of AWS account numbers to run against in parallel (requires --role-name)",
+        type=str
+    )
+
+    argument_group.add_argument(
+        "--accounts-file",
+        help="Use this to pass in a file containing AWS account numbers (one per line) to run against in parallel (requires --role-name)",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--role-name",
+        "--rn",
+        help="Use to specify the name of the IAM role to assume on each account passed using --accounts or --accounts-file",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--serve",
+        help="Use to run as a long-running server, keeping sessions and (with --report-cache-ttl) credential reports warm, which runs operations sent using --via-server",
+        action="store_true"
+    )
+
+    argument_parser.add_argument(
+        "--via-server",
+        "--vs",
+        help="Use to send the passed operations (-s, -l, -d, -D, -L) to a server started with --serve instead of running them locally",
+        action="store_true"
+    )
+
+    argument_parser.add_argument(
+        "--server-address",
+        "--sa",
+        help=f"Use to specify the Unix socket path, or host:port, used by --serve and --via-server (default: {default_server_address})",
+        type=str,
+        default=default_server_address
+    )
+
+    argument_parser.add_argument(
+        "--concurrency",
+        help="Use to specify how many accounts passed using --accounts or --accounts-file should be worked on at the same time (default: 5)",
+        type=int,
+        default=5
+    )
+
+    argument_parser.add_argument(
+        "--aggregate",
+        "--agg",
+        help="Use with -l and --accounts or --accounts-file to print a single report of the unused access methods on every account, with totals and the stalest access keys, sent to Slack as one digest when --notify-slack is passed",
+        action="store_true"
+    )
+
+    argument_parser.add_argument(
+        "--sort-by",
+        help="Use to specify the column the --aggregate report is sorted by (default: age, stalest first)",
+        choices=aggregate_sort_options,
+        default="age"
+    )
+
+    argument_parser.add_argument(
+        "--top",
+        help="Use to specify how many of the stalest access keys the --aggregate report shows (default: 10)",
+        type=int,
+        default=10
+    )
+
     args = argument_parser.parse_args()
 
     # Update global variable if dry-run passed
@@ -1032,14 +4259,60 @@ if __name__ == "__main__":
     # Update global variable for aws region if passed
     is_an_aws_region_passed_in(args.aws_region)
 
+    # Update credential report timeout if passed
+    is_credential_report_timeout_passed_in(args.credential_report_timeout)
+
+    # Update maximum credential report age if passed
+    is_max_report_age_passed_in(args.max_report_age)
+
+    # Update local credential report cache settings if passed
+    is_report_cache_passed_in(args)
+
+    # Update global variable if cache-role-credentials passed
+    is_role_credential_cache_active(args.cache_role_credentials)
+
+    # Update global variable if state-file passed
+    is_state_file_passed_in(args.state_file)
+
+    # Update plan file variables if plan or apply passed
+    is_remediation_plan_passed_in(args)
+
+    # Start collecting metrics if metrics-json, prometheus-textfile or statsd passed
+    is_metrics_passed_in(args)
+
+    # Start writing records if output passed
+    is_output_format_passed_in(args)
+
+    # Update fleet report settings if aggregate passed
+    is_aggregate_passed_in(args)
+
+    # Update remediation workers and IAM mutation rate if passed
+    is_remediation_concurrency_passed_in(args)
+
+    # Update Slack digest settings if passed
+    is_slack_batching_passed_in(args)
+
     # Update super user url override if --super-users-url passed
     is_super_user_override_url_passed_in(args)
 
-    # Initialise IAM client using default profile if local or specified jenkins profile if on jenkins
-    initialise_leading_iam_client_check(args)
+    # Run as a server, or send the requested operations to one, if requested
+    if args.serve:
+        serve_requests_with(args)
+    elif args.via_server:
+        run_via_server(args)
+    # Fan out across multiple accounts if requested
+    elif args.accounts or args.accounts_file:
+        sweep_accounts_with(args)
+    else:
+        # Initialise IAM client using default profile if local or specified jenkins profile if on jenkins
+        leading_context = initialise_leading_iam_client_check(args)
+
+        # Check to see the method the user wishes to authenticate/ create their boto client
+        context = are_set_credentials_arguments_active(args, leading_context)
 
-    # Check to see the method the user wishes to authenticate/ create their boto client
-    are_set_credentials_arguments_active(args)
+        # Check to see what arguments have been passed and require specific action
+        check_and_action_active(context, args)
 
-    # Check to see what arguments have been passed and require specific action
-    check_and_action_active(args)
\ No newline at end of file
+        # Save what was planned
+        if remediation_plan_file:
+            save_remediation_plan_to(remediation_plan_file)
\ No newline at end of file
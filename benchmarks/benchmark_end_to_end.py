@@ -0,0 +1,429 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import argparse
+import collections
+import contextlib
+import datetime
+import io
+import json
+import platform
+import threading
+import time
+import boto3
+import botocore.awsrequest
+
+from benchmark_report_parsing import generate_synthetic_credential_report
+
+# Make awsklean importable when running from the benchmarks directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import awsklean
+
+
+# The arguments each timed command is run with, as passed on the command line
+commands = collections.OrderedDict([
+    ("-s", "show_users_with_no_usage_within"),
+    ("-l", "list_users_with_no_usage_within"),
+    ("-L", "list_users_to_be_kleaned"),
+    ("-d", "deactivate_access_for_users_with_no_usage_within"),
+    ("-D", "delete_access_for_users_with_no_usage_within"),
+])
+
+
+class LocalIAMError(Exception):
+    """Raised by the local stand-in to answer a call with an AWS error
+
+    :param error_code: The AWS error code, e.g. NoSuchEntity
+    :type error_code: str
+    :param status_code: The HTTP status code AWS answers with
+    :type status_code: int
+    """
+    def __init__(self, error_code: str, status_code: int):
+        super().__init__(error_code)
+        self.error_code = error_code
+        self.status_code = status_code
+
+class LocalIAM:
+    """Stands in for IAM and STS by answering every call made by boto3 clients on the session it is registered with,
+    from a synthetic credential report and access keys that match it, before any request is sent.
+    The calls still go through botocore's parameter validation and serialisation, and raise botocore's own errors
+
+    :param report: List of the rows in the credential report, starting with the header row
+    :type report: list
+    :param latency_ms: Milliseconds each call waits before it is answered
+    :type latency_ms: float
+    :param report_generation_seconds: Seconds the credential report takes to be generated
+    :type report_generation_seconds: float
+    """
+    def __init__(self, report: list, latency_ms: float = 0, report_generation_seconds: float = 0):
+        self.report = report
+        self.latency_seconds = latency_ms / 1000
+        self.report_generation_seconds = report_generation_seconds
+        self.lock = threading.Lock()
+        self.calls = collections.Counter()
+        self.reset()
+
+    def reset(self) -> None:
+        """Puts the access keys back as the report describes them and forgets the report was generated
+
+        :returns: None
+        """
+        self.access_keys = {}
+        self.generation_started_at = None
+
+        for user_number, row in enumerate(self.report[1:]):
+            columns = row.split(",")
+            user_name = columns[0]
+            self.access_keys[user_name] = [
+                {
+                    'UserName': user_name,
+                    'AccessKeyId': f"AKIA{user_number:015d}{access_key_number}",
+                    'Status': 'Active' if columns[active_index] == "true" else 'Inactive',
+                    'CreateDate': awsklean.convert_this_to_date(string=columns[active_index + 1])
+                }
+                for access_key_number, active_index in ((1, 8), (2, 13))
+                if columns[active_index + 1] not in awsklean.credential_report_placeholders
+            ]
+
+    def register_with(self, session: object) -> None:
+        """Answers the calls made by every client created from the session
+
+        :param session: boto3 session
+        :type session: object
+
+        :returns: None
+        """
+        session.events.register('before-call.*.*', self.answer)
+
+    def answer(self, model: object, params: dict, **kwargs) -> tuple:
+        """Answers a call in place of AWS, taking the call's parameters from its serialised query body
+
+        :returns: Tuple of the HTTP response and the parsed response
+        :rtype: tuple
+        """
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        body = params.get('body') or {}
+
+        with self.lock:
+            self.calls[model.name] += 1
+
+            try:
+                return botocore.awsrequest.AWSResponse(None, 200, {}, None), getattr(self, model.name)(body)
+            except LocalIAMError as err:
+                return botocore.awsrequest.AWSResponse(None, err.status_code, {}, None), {'Error': {'Code': err.error_code, 'Message': model.name}}
+
+    def GenerateCredentialReport(self, body: dict) -> dict:
+        if self.generation_started_at is None:
+            self.generation_started_at = time.time()
+
+        return {'State': 'COMPLETE' if self.is_credential_report_ready() else 'STARTED'}
+
+    def GetCredentialReport(self, body: dict) -> dict:
+        if self.generation_started_at is None:
+            raise LocalIAMError('ReportNotPresent', 410)
+
+        if not self.is_credential_report_ready():
+            raise LocalIAMError('ReportInProgress', 404)
+
+        return {
+            'Content': "\n".join(self.report).encode(),
+            'ReportFormat': 'text/csv',
+            'GeneratedTime': datetime.datetime.fromtimestamp(self.generation_started_at + self.report_generation_seconds, datetime.timezone.utc)
+        }
+
+    def ListAccessKeys(self, body: dict) -> dict:
+        return {'AccessKeyMetadata': [dict(access_key) for access_key in self.access_keys.get(body['UserName'], [])], 'IsTruncated': False}
+
+    def UpdateAccessKey(self, body: dict) -> dict:
+        self.find_access_key(body)['Status'] = body['Status']
+        return {}
+
+    def DeleteAccessKey(self, body: dict) -> dict:
+        self.access_keys[body['UserName']].remove(self.find_access_key(body))
+        return {}
+
+    def DeleteLoginProfile(self, body: dict) -> dict:
+        return {}
+
+    def ListAccountAliases(self, body: dict) -> dict:
+        return {'AccountAliases': ['benchmark'], 'IsTruncated': False}
+
+    def GetCallerIdentity(self, body: dict) -> dict:
+        return {'Account': '111122223333', 'UserId': 'benchmark', 'Arn': 'arn:aws:iam::111122223333:user/benchmark'}
+
+    def is_credential_report_ready(self) -> bool:
+        return time.time() - self.generation_started_at >= self.report_generation_seconds
+
+    def find_access_key(self, body: dict) -> dict:
+        for access_key in self.access_keys.get(body['UserName'], []):
+            if access_key['AccessKeyId'] == body['AccessKeyId']:
+                return access_key
+
+        raise LocalIAMError('NoSuchEntity', 404)
+
+def create_benchmark_context_for(local_iam: LocalIAM) -> object:
+    """Creates an awsklean account context whose IAM and STS clients are answered by the local stand-in
+
+    :param local_iam: Local stand-in for IAM and STS
+    :type local_iam: LocalIAM
+
+    :returns: Account context
+    :rtype: AccountContext
+    """
+    session = boto3.session.Session(aws_access_key_id="benchmark", aws_secret_access_key="benchmark", region_name="us-east-1")
+    local_iam.register_with(session)
+
+    context = awsklean.AccountContext(session=session, iam_client=session.client('iam'))
+    context.account_identification = awsklean.get_current_account_id(context)
+
+    return context
+
+def build_arguments_for(command: str, number_of_days: int) -> object:
+    """Builds the arguments awsklean would parse for the command
+
+    :param command: One of -s, -l, -L, -d or -D
+    :type command: str
+    :param number_of_days: Days passed with the command
+    :type number_of_days: int
+
+    :returns: The arguments
+    :rtype: object
+    """
+    arguments = argparse.Namespace(**{option: None for option in commands.values()})
+    setattr(arguments, commands[command], True if command == "-L" else number_of_days)
+
+    return arguments
+
+def time_this(function: object) -> float:
+    """Runs the function once with its output thrown away and returns how long it took
+
+    :param function: Function to time
+    :type function: object
+
+    :returns: Time in seconds
+    :rtype: float
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        function()
+        return time.perf_counter() - start_time
+
+def run_benchmark_for(number_of_users: int, arguments: object) -> dict:
+    """Times each command end to end, then each stage on its own, against a synthetic account
+
+    :param number_of_users: Number of user rows in the synthetic credential report
+    :type number_of_users: int
+    :param arguments: The arguments passed into the benchmark
+    :type arguments: object
+
+    :returns: Dict of the best times (in seconds) and the API calls made by each command
+    :rtype: dict
+    """
+    local_iam = LocalIAM(generate_synthetic_credential_report(number_of_users), arguments.latency_ms, arguments.report_generation_seconds)
+    results = {"users": number_of_users, "commands": collections.OrderedDict(), "stages": collections.OrderedDict(), "api_calls": collections.OrderedDict()}
+
+    def record(results_for: dict, name: str, seconds: float) -> None:
+        results_for[name] = min(seconds, results_for.get(name, seconds))
+
+    for _ in range(arguments.repeat):
+        for command in commands:
+            local_iam.reset()
+            local_iam.calls.clear()
+            context = create_benchmark_context_for(local_iam)
+            command_arguments = build_arguments_for(command, arguments.days)
+
+            record(results["commands"], command, time_this(lambda: awsklean.check_and_action_active(context, command_arguments)))
+            results["api_calls"][command] = dict(local_iam.calls)
+
+        # Each stage of a deactivation, one at a time
+        local_iam.reset()
+        context = create_benchmark_context_for(local_iam)
+        report = []
+        records = []
+        users_collection = {}
+
+        record(results["stages"], "report_wait", time_this(lambda: report.extend(awsklean.get_all_users_in_aws_account(context))))
+        record(results["stages"], "parse", time_this(lambda: records.extend(awsklean.parse_credential_report(report))))
+        context.credential_report_snapshot = records
+        record(results["stages"], "classify", time_this(lambda: users_collection.update(awsklean.get_all_users_not_used_in_the_last(context, number_of_days=arguments.days, source_report=lambda: records))))
+        record(results["stages"], "remediate", time_this(lambda: awsklean.carry_out_action_on_users_in(context, users_collection, action="deactivate")))
+
+    return results
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints how each time compares to the same time in a baseline results file
+
+    :param results: The results of this run
+    :type results: dict
+    :param baseline: The results loaded from the baseline file
+    :type baseline: dict
+    :param tolerance: How many times slower than the baseline a time can be before it counts as a regression
+    :type tolerance: float
+
+    :returns: Whether every time is within the tolerance
+    :rtype: bool
+    """
+    baseline_runs = {run["users"]: run for run in baseline.get("runs", [])}
+    is_within_tolerance = True
+
+    if baseline.get("settings") != results["settings"]:
+        print(f"ATTENTION: \nThe baseline was run with different settings, so the times may not be comparable: {baseline.get('settings')}")
+
+    print(f"Compared with the baseline (regression if over {tolerance:.2f}x)")
+
+    for run in results["runs"]:
+        baseline_run = baseline_runs.get(run["users"])
+
+        if baseline_run is None:
+            continue
+
+        for group in ("commands", "stages"):
+            for name, seconds in run[group].items():
+                baseline_seconds = baseline_run.get(group, {}).get(name)
+
+                if not baseline_seconds:
+                    continue
+
+                ratio = seconds / baseline_seconds
+                is_regression = ratio > tolerance
+                is_within_tolerance = is_within_tolerance and not is_regression
+
+                print(f"• {run['users']:>7} users {name:<12}{ratio:7.2f}x{'  REGRESSION' if is_regression else ''}")
+
+    return is_within_tolerance
+
+def run_benchmarks(arguments: object) -> bool:
+    """Runs the benchmark for each number of users, prints the times and saves them as JSON
+
+    :param arguments: The arguments passed into the benchmark
+    :type arguments: object
+
+    :returns: Whether the times are within the tolerance of the baseline, if one was passed
+    :rtype: bool
+    """
+    # Keep the benchmark away from the network and from anything a previous run left behind
+    awsklean.super_user_matcher = awsklean.build_super_user_matcher_from({"superUsers": ["<root_account>"]})
+    awsklean.iam_mutations_per_second = arguments.iam_mutations_per_second
+    awsklean.remediation_workers = arguments.remediation_workers
+    awsklean.report_cache_ttl = None
+    awsklean.state_file = None
+
+    results = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+        "awsklean_version": awsklean.script_version,
+        "python_version": platform.python_version(),
+        "settings": {
+            "latency_ms": arguments.latency_ms,
+            "report_generation_seconds": arguments.report_generation_seconds,
+            "days": arguments.days,
+            "repeat": arguments.repeat,
+            "remediation_workers": arguments.remediation_workers,
+            "iam_mutations_per_second": arguments.iam_mutations_per_second
+        },
+        "runs": []
+    }
+
+    for number_of_users in arguments.users:
+        run = run_benchmark_for(number_of_users, arguments)
+        results["runs"].append(run)
+
+        print(f"Synthetic account: {number_of_users} users, {arguments.latency_ms:g} ms latency per call (best of {arguments.repeat})")
+        for command, seconds in run["commands"].items():
+            print(f"• awsklean {command} {arguments.days if command != '-L' else '':<4}{seconds * 1000:12.2f} ms  {sum(run['api_calls'][command].values()):>8} API call(s)")
+        for stage, seconds in run["stages"].items():
+            print(f"• stage {stage:<13}{seconds * 1000:12.2f} ms")
+
+    with open(arguments.output, "w") as file:
+        json.dump(results, file, indent=4)
+
+    print(f"Results saved to {arguments.output}")
+
+    if arguments.baseline:
+        with open(arguments.baseline, "r") as file:
+            return compare_with_baseline(results, json.load(file), arguments.tolerance)
+
+    return True
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="End to end benchmark for awsklean against a local stand-in for IAM and STS"
+    )
+
+    argument_parser.add_argument(
+        "--users",
+        help="Comma separated numbers of users in the synthetic credential reports (default: 100,10000,100000)",
+        type=lambda value: [int(number) for number in value.split(",")],
+        default=[100, 10000, 100000]
+    )
+
+    argument_parser.add_argument(
+        "--latency-ms",
+        help="Milliseconds each API call waits before it is answered (default: 0)",
+        type=float,
+        default=0
+    )
+
+    argument_parser.add_argument(
+        "--report-generation-seconds",
+        help="Seconds the credential report takes to be generated (default: 0)",
+        type=float,
+        default=0
+    )
+
+    argument_parser.add_argument(
+        "--days",
+        help="Number of days passed to each command (default: 90)",
+        type=int,
+        default=90
+    )
+
+    argument_parser.add_argument(
+        "--repeat",
+        help="Number of times to run each benchmark (default: 1)",
+        type=int,
+        default=1
+    )
+
+    argument_parser.add_argument(
+        "--remediation-workers",
+        help="Number of users -d and -D work on at once (default: 1)",
+        type=int,
+        default=1
+    )
+
+    argument_parser.add_argument(
+        "--iam-mutations-per-second",
+        help="Most IAM changes -d and -D make per second (default: 1000000, so the benchmark is not held back by the limiter)",
+        type=float,
+        default=1000000
+    )
+
+    argument_parser.add_argument(
+        "--output",
+        help="Path of the JSON file results are saved to (default: benchmark_end_to_end.json)",
+        type=str,
+        default="benchmark_end_to_end.json"
+    )
+
+    argument_parser.add_argument(
+        "--baseline",
+        help="Path of a JSON file saved by an earlier run to compare the results with",
+        type=str
+    )
+
+    argument_parser.add_argument(
+        "--tolerance",
+        help="How many times slower than the baseline a time can be before the benchmark fails (default: 1.25)",
+        type=float,
+        default=1.25
+    )
+
+    args = argument_parser.parse_args()
+
+    if not run_benchmarks(args):
+        exit(1)
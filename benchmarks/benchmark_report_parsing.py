@@ -0,0 +1,156 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import argparse
+import datetime
+import random
+import timeit
+import dateutil.parser
+
+# Make awsklean importable when running from the benchmarks directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import awsklean
+
+
+credential_report_header = "user,arn,user_creation_time,password_enabled,password_last_used,password_last_changed,password_next_rotation,mfa_active,access_key_1_active,access_key_1_last_rotated,access_key_1_last_used_date,access_key_1_last_used_region,access_key_1_last_used_service,access_key_2_active,access_key_2_last_rotated,access_key_2_last_used_date,access_key_2_last_used_region,access_key_2_last_used_service,cert_1_active,cert_1_last_rotated,cert_2_active,cert_2_last_rotated"
+
+
+def generate_timestamp_days_ago(days: int) -> str:
+    """Generates a timestamp in the format used by the credential report
+
+    :param days: How many days before now the timestamp should be
+    :type days: int
+
+    :returns: Timestamp written as string
+    :rtype: str
+    """
+    timestamp = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+def generate_synthetic_credential_report(number_of_users: int, seed: int = 1) -> list:
+    """Generates a credential report with a mix of used, unused and disabled access methods
+
+    :param number_of_users: Number of user rows to generate
+    :type number_of_users: int
+    :param seed: Seed used so repeated runs generate the same report
+    :type seed: int
+
+    :returns: List of the rows in the report, starting with the header row
+    :rtype: list
+    """
+    generator = random.Random(seed)
+    report = [credential_report_header]
+
+    for user_number in range(number_of_users):
+        password_enabled = generator.choice(["true", "false"])
+        password_last_used = generator.choice([generate_timestamp_days_ago(generator.randint(0, 365)), "no_information"]) if password_enabled == "true" else "N/A"
+        access_key_1_active = generator.choice(["true", "false"])
+        access_key_1_last_used = generator.choice([generate_timestamp_days_ago(generator.randint(0, 365)), "N/A"]) if access_key_1_active == "true" else "N/A"
+        access_key_2_active = generator.choice(["true", "false"])
+        access_key_2_last_used = generator.choice([generate_timestamp_days_ago(generator.randint(0, 365)), "N/A"]) if access_key_2_active == "true" else "N/A"
+        created = generate_timestamp_days_ago(400)
+
+        report.append(
+            f"user{user_number},arn:aws:iam::111122223333:user/user{user_number},{created},{password_enabled},{password_last_used},{created},N/A,false,"
+            f"{access_key_1_active},{created},{access_key_1_last_used},us-east-1,iam,{access_key_2_active},{created},{access_key_2_last_used},us-east-1,iam,false,N/A,false,N/A"
+        )
+
+    return report
+
+def time_this(function: object, repeat: int) -> float:
+    """Runs the function the passed number of times and returns the best time
+
+    :param function: Function to time
+    :type function: object
+    :param repeat: Number of times to run the function
+    :type repeat: int
+
+    :returns: Best time in seconds
+    :rtype: float
+    """
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+def classify_users_in(records: list, number_of_days: int = 90) -> dict:
+    """Runs awsklean's classification against already parsed records, using an account context with no clients
+
+    :param records: List of CredentialReportRow to classify
+    :type records: list
+    :param number_of_days: The number of days before today to check up until
+    :type number_of_days: int
+
+    :returns: Collection of users and the state of their access methods
+    :rtype: dict
+    """
+    context = awsklean.AccountContext(session=None, iam_client=None)
+
+    return awsklean.get_all_users_not_used_in_the_last(context, number_of_days=number_of_days, source_report=lambda: records)
+
+def run_benchmarks(number_of_users: int, repeat: int) -> None:
+    """Times converting the report timestamps with dateutil against the fast path, comparing timestamps to the cutoff
+    as dates against as strings, then the full report parse and classification and the set queries made on its result
+
+    :param number_of_users: Number of user rows in the synthetic report
+    :type number_of_users: int
+    :param repeat: Number of times to run each benchmark
+    :type repeat: int
+
+    :returns: None
+    """
+    report = generate_synthetic_credential_report(number_of_users)
+    timestamps = [
+        row[column]
+        for row in (row.split(",") for row in report[1:])
+        for column in (4, 10, 15)
+        if row[column] not in awsklean.credential_report_placeholders
+    ]
+
+    dateutil_seconds = time_this(lambda: [dateutil.parser.parse(value) for value in timestamps], repeat)
+    fast_path_seconds = time_this(lambda: [awsklean.convert_this_to_date(string=value) for value in timestamps], repeat)
+    cutoff_date = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=90)
+    cutoff_timestamp = cutoff_date.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    compare_as_dates_seconds = time_this(lambda: [awsklean.convert_this_to_date(string=value) < cutoff_date for value in timestamps], repeat)
+    compare_as_strings_seconds = time_this(lambda: [value < cutoff_timestamp for value in timestamps], repeat)
+
+    parse_seconds = time_this(lambda: awsklean.parse_credential_report(report), repeat)
+    records = awsklean.parse_credential_report(report)
+    classify_seconds = time_this(lambda: classify_users_in(records), repeat)
+    collection = classify_users_in(records)
+    any_unused_seconds = time_this(lambda: collection.get_users_with_an_unused_access_method(), repeat)
+    none_enabled_seconds = time_this(lambda: collection.get_users_not_using_any_access_methods(), repeat)
+
+    print(f"Synthetic credential report: {number_of_users} users, {len(timestamps)} timestamps (best of {repeat})")
+    print(f"• dateutil.parser.parse:        {dateutil_seconds * 1000:9.2f} ms")
+    print(f"• convert_this_to_date:         {fast_path_seconds * 1000:9.2f} ms ({dateutil_seconds / fast_path_seconds:.1f}x faster)")
+    print(f"• compare to cutoff as dates:   {compare_as_dates_seconds * 1000:9.2f} ms")
+    print(f"• compare to cutoff as strings: {compare_as_strings_seconds * 1000:9.2f} ms ({compare_as_dates_seconds / compare_as_strings_seconds:.1f}x faster)")
+    print(f"• parse_credential_report:      {parse_seconds * 1000:9.2f} ms")
+    print(f"• classify (90 days):           {classify_seconds * 1000:9.2f} ms")
+    print(f"• users with any unused method: {any_unused_seconds * 1000:9.2f} ms")
+    print(f"• users with no method enabled: {none_enabled_seconds * 1000:9.2f} ms")
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Micro-benchmark for parsing and classifying the AWS credential report with awsklean"
+    )
+
+    argument_parser.add_argument(
+        "--users",
+        help="Number of users in the synthetic credential report (default: 10000)",
+        type=int,
+        default=10000
+    )
+
+    argument_parser.add_argument(
+        "--repeat",
+        help="Number of times to run each benchmark (default: 5)",
+        type=int,
+        default=5
+    )
+
+    args = argument_parser.parse_args()
+
+    run_benchmarks(number_of_users=args.users, repeat=args.repeat)
@@ -0,0 +1,192 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import argparse
+import json
+import subprocess
+import time
+
+
+repository_location = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Imports awsklean defers until the code paths that need them
+deferred_imports = ["boto3", "botocore", "requests", "dateutil", "asyncio", "concurrent.futures", "sqlite3"]
+
+
+def get_import_times_for(code: str) -> dict:
+    """Runs the code in a new interpreter with -X importtime and collects how long each import took
+
+    :param code: Python code to run
+    :type code: str
+
+    :returns: List of tuples holding the name, cumulative import time (in microseconds) and nesting depth of
+    each import, in the order -X importtime reports them (imports are listed before the module importing them)
+    :rtype: list
+    """
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=repository_location,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+
+    import_times = []
+
+    # Lines look like: import time:       262 |       1746 |     email._parseaddr
+    for line in completed_process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        import_times.append((name.strip(), int(cumulative), (len(name) - len(name.lstrip()) - 1) // 2))
+
+    return import_times
+
+def get_imports_made_by(import_times: list, module: str) -> list:
+    """Finds the imports made directly by the module, from the import times reported by -X importtime
+
+    :param import_times: List of tuples holding the name, cumulative import time and nesting depth of each import
+    :type import_times: list
+    :param module: Name of the top level module
+    :type module: str
+
+    :returns: List of tuples holding the name and cumulative import time of each import made by the module
+    :rtype: list
+    """
+    imports_made = []
+
+    for name, cumulative, depth in import_times:
+        # A new top level import starts, anything collected so far belonged to the previous one
+        if depth == 0:
+            if name == module:
+                return imports_made
+
+            imports_made = []
+        elif depth == 1:
+            imports_made.append((name, cumulative))
+
+    return []
+
+def get_modules_loaded_by(code: str) -> list:
+    """Runs the code in a new interpreter and checks which of the deferred imports it loaded
+
+    :param code: Python code to run
+    :type code: str
+
+    :returns: List of the deferred imports that were loaded
+    :rtype: list
+    """
+    completed_process = subprocess.run(
+        [sys.executable, "-c", f"import sys\n{code}\nimport json\nprint(json.dumps([module for module in {deferred_imports!r} if module in sys.modules]))"],
+        cwd=repository_location,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+
+    return json.loads(completed_process.stdout.splitlines()[-1])
+
+def time_command(arguments: list, repeat: int) -> float:
+    """Runs a new interpreter with the passed arguments and returns the best wall time
+
+    :param arguments: Arguments to pass to the interpreter
+    :type arguments: list
+    :param repeat: Number of times to run the command
+    :type repeat: int
+
+    :returns: Best time in seconds
+    :rtype: float
+    """
+    best_seconds = None
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=repository_location, stdout=subprocess.DEVNULL, check=True)
+        seconds = time.perf_counter() - start_time
+
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+
+    return best_seconds
+
+def run_benchmarks(repeat: int, budget_ms: float, top: int) -> bool:
+    """Measures the cost of importing awsklean and of starting it for --version and --help, checking
+    the import stays within the budget and the deferred imports are not loaded
+
+    :param repeat: Number of times to run each benchmark
+    :type repeat: int
+    :param budget_ms: Most milliseconds importing awsklean may take
+    :type budget_ms: float
+    :param top: Number of the slowest imports to show
+    :type top: int
+
+    :returns: Whether startup is within budget
+    :rtype: bool
+    """
+    import_times = min(
+        (get_import_times_for("import awsklean") for _ in range(repeat)),
+        key=lambda import_times: import_times[-1][1]
+    )
+    awsklean_import_ms = import_times[-1][1] / 1000
+    loaded_deferred_imports = get_modules_loaded_by("import awsklean")
+
+    interpreter_seconds = time_command(["-c", "pass"], repeat)
+    version_seconds = time_command(["awsklean.py", "--version"], repeat)
+    help_seconds = time_command(["awsklean.py", "--help"], repeat)
+
+    print(f"awsklean startup (best of {repeat})")
+    print(f"• empty interpreter:        {interpreter_seconds * 1000:9.2f} ms")
+    print(f"• awsklean.py --version:    {version_seconds * 1000:9.2f} ms")
+    print(f"• awsklean.py --help:       {help_seconds * 1000:9.2f} ms")
+    print(f"• import awsklean:          {awsklean_import_ms:9.2f} ms (budget {budget_ms:.0f} ms)")
+    print(f"Slowest imports made by awsklean (not already loaded by the interpreter):")
+
+    # Only look at the modules awsklean imports itself, their own imports are included in their time
+    slowest_imports = sorted(get_imports_made_by(import_times, "awsklean"), key=lambda import_time: import_time[1], reverse=True)
+    for name, cumulative in slowest_imports[:top]:
+        print(f"  {name:<24}{cumulative / 1000:9.2f} ms")
+
+    is_within_budget = awsklean_import_ms <= budget_ms and not loaded_deferred_imports
+
+    if loaded_deferred_imports:
+        print(f"ATTENTION: \nimport awsklean loaded imports that should be deferred: {', '.join(loaded_deferred_imports)}")
+
+    if awsklean_import_ms > budget_ms:
+        print(f"ATTENTION: \nimport awsklean took {awsklean_import_ms:.2f} ms, over the {budget_ms:.0f} ms budget")
+
+    return is_within_budget
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Startup benchmark for awsklean, using python -X importtime"
+    )
+
+    argument_parser.add_argument(
+        "--repeat",
+        help="Number of times to run each benchmark (default: 5)",
+        type=int,
+        default=5
+    )
+
+    argument_parser.add_argument(
+        "--budget-ms",
+        help="Most milliseconds importing awsklean may take before the benchmark fails (default: 50)",
+        type=float,
+        default=50
+    )
+
+    argument_parser.add_argument(
+        "--top",
+        help="Number of the slowest imports to show (default: 10)",
+        type=int,
+        default=10
+    )
+
+    args = argument_parser.parse_args()
+
+    if not run_benchmarks(repeat=args.repeat, budget_ms=args.budget_ms, top=args.top):
+        exit(1)